@@ -0,0 +1,79 @@
+import argparse
+import sys
+
+from benchmarks.suite import BenchmarkSuite
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the cleaning engine on seeded synthetic C-family sources.",
+    )
+    sizes = parser.add_mutually_exclusive_group()
+    sizes.add_argument("--sizes", default=",".join(map(str, BenchmarkSuite.DEFAULT_SIZES)),
+                       help="comma-separated corpus sizes in lines (default: %(default)s)")
+    sizes.add_argument("--full", action="store_const", dest="sizes",
+                       const=",".join(map(str, BenchmarkSuite.FULL_SIZES)),
+                       help=f"run every size up to {BenchmarkSuite.FULL_SIZES[-1]:,} lines")
+    parser.add_argument("--only", default=",".join(BenchmarkSuite.BENCHMARKS),
+                        help="comma-separated benchmarks to run (default: %(default)s)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per case, best is kept (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed (default: %(default)s)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory run")
+    parser.add_argument("--save", metavar="FILE", help="write the report as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio flagged as a regression (default: %(default)s)")
+    return parser
+
+
+def print_result(result):
+    peak = result["peak_bytes"]
+    memory = f"{peak / 1e6:9.1f} MB" if peak is not None else "        -   "
+    print(f"{result['name']:<60} {result['seconds'] * 1000:10.2f} ms "
+          f"{result['lines_per_s']:14,.0f} lines/s {result['mb_per_s']:8.1f} MB/s {memory}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    benchmarks = [name for name in args.only.split(",") if name]
+    unknown = set(benchmarks) - set(BenchmarkSuite.BENCHMARKS)
+    if unknown:
+        print(f"error: unknown benchmarks: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    if args.repeat < 1:
+        print("error: --repeat must be at least 1", file=sys.stderr)
+        return 2
+
+    suite = BenchmarkSuite(
+        sizes=[int(size) for size in args.sizes.split(",") if size],
+        repeat=args.repeat,
+        seed=args.seed,
+        measure_memory=not args.no_memory,
+        benchmarks=benchmarks,
+    )
+    report = suite.run(progress=print_result)
+
+    print("\nScaling exponents (1.0 = linear):")
+    for name, curve in report["scaling"].items():
+        steps = "  ".join(f"{step['from']}->{step['to']}: {step['exponent']:.2f}" for step in curve)
+        print(f"  {name:<56} {steps}")
+
+    if args.save:
+        suite.save(report, args.save)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        regressions = suite.compare(suite.load(args.compare), report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression['name']:<60} {regression['baseline'] * 1000:.2f} ms -> "
+                      f"{regression['current'] * 1000:.2f} ms ({regression['ratio']:.2f}x)")
+            return 1
+        print(f"\nNo regressions above {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
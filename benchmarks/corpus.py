@@ -0,0 +1,82 @@
+import random
+
+
+class CorpusGenerator:
+    """Genera código fuente estilo C reproducible a partir de una semilla.
+
+    `comment_density` es la fracción aproximada de líneas que son comentarios
+    (de línea o de bloque) y `block_length` el largo medio en líneas de los
+    comentarios de bloque. Incluye literales con `//` y `/*` dentro para que
+    el lexer no pueda tomar atajos.
+    """
+
+    TYPES = ("int", "long", "double", "char *", "size_t", "bool", "uint32_t")
+    NAMES = ("count", "index", "buffer", "total", "result", "node", "offset", "length", "value", "state")
+    CALLS = ("process", "update", "flush", "resize", "validate", "emit", "reset", "lookup")
+    WORDS = ("TODO", "fix", "the", "buffer", "when", "length", "is", "zero", "see", "issue",
+             "handles", "overflow", "fast", "path", "for", "small", "inputs", "note")
+
+    def __init__(self, seed=0, comment_density=0.25, block_length=4, blank_ratio=0.08):
+        self.seed = seed
+        self.comment_density = comment_density
+        self.block_length = block_length
+        self.blank_ratio = blank_ratio
+
+    def _words(self, rnd, low=3, high=10):
+        return " ".join(rnd.choice(self.WORDS) for _ in range(rnd.randint(low, high)))
+
+    def _statement(self, rnd, indent):
+        name = rnd.choice(self.NAMES)
+        kind = rnd.random()
+        if kind < 0.3:
+            line = f"{rnd.choice(self.TYPES)} {name} = {rnd.randint(0, 4096)};"
+        elif kind < 0.55:
+            line = f"{name} = {rnd.choice(self.CALLS)}({rnd.choice(self.NAMES)}, {rnd.randint(0, 64)});"
+        elif kind < 0.7:
+            line = f'log_message("{rnd.choice(self.CALLS)}: // not a comment /* nor this */", {name});'
+        elif kind < 0.8:
+            line = f"if ({name} == '/' || {name} == '\\'') {{ {name}++; }}"
+        elif kind < 0.9:
+            line = f"{name} += {rnd.choice(self.NAMES)} * 2;  // {self._words(rnd, 2, 5)}"
+        else:
+            line = f"{name} = {rnd.choice(self.NAMES)} /* inline */ + 1;"
+        return indent + line
+
+    def _block_comment(self, rnd, indent, limit):
+        length = max(1, min(limit, int(rnd.expovariate(1 / self.block_length)) + 1))
+        if length == 1:
+            return [f"{indent}/* {self._words(rnd)} */"]
+        body = [f"{indent} * {self._words(rnd)}" for _ in range(length - 2)]
+        return [f"{indent}/**"] + body + [f"{indent} */"]
+
+    def generate_lines(self, line_count):
+        """Genera exactamente `line_count` líneas de código"""
+        rnd = random.Random(self.seed)
+        lines = ["#include <stdio.h>", "#include <stdlib.h>", ""][:line_count]
+        function = 0
+        while len(lines) < line_count:
+            remaining = line_count - len(lines)
+            roll = rnd.random()
+            indent = "    " * rnd.randint(0, 2)
+            if roll < self.blank_ratio:
+                lines.append("")
+            elif roll < self.blank_ratio + self.comment_density * 0.5:
+                lines.append(f"{indent}// {self._words(rnd)}")
+            elif roll < self.blank_ratio + self.comment_density:
+                lines.extend(self._block_comment(rnd, indent, remaining))
+            elif roll < self.blank_ratio + self.comment_density + 0.04 and remaining >= 2:
+                function += 1
+                lines.append(f"static int {rnd.choice(self.CALLS)}_{function}(int {rnd.choice(self.NAMES)}) {{")
+                lines.append("}")
+            else:
+                lines.append(self._statement(rnd, indent))
+        return lines
+
+    def generate(self, line_count):
+        """Genera el código como un único texto"""
+        return "\n".join(self.generate_lines(line_count))
+
+    def highlight(self, line_count, ratio, seed=None):
+        """Elige de forma reproducible una fracción `ratio` de líneas a resaltar"""
+        rnd = random.Random(self.seed if seed is None else seed)
+        return set(rnd.sample(range(line_count), int(line_count * ratio)))
@@ -0,0 +1,187 @@
+import gc
+import json
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.corpus import CorpusGenerator
+from core.code_processor import CodeProcessor
+from core.line_set import LineSet
+
+
+class BenchmarkSuite:
+    """Mide el rendimiento de CodeProcessor sobre corpus sintéticos reproducibles.
+
+    Cada caso se ejecuta `repeat` veces y se reporta el mejor tiempo, la
+    mediana, el rendimiento en líneas/s y MB/s y, opcionalmente, el pico de
+    memoria medido con tracemalloc en una ejecución aparte.
+    """
+
+    # (densidad de comentarios, largo medio de los comentarios de bloque)
+    PROFILES = {
+        "sparse": (0.05, 2),
+        "typical": (0.25, 4),
+        "dense": (0.5, 12),
+    }
+    HIGHLIGHT_RATIOS = (0.01, 0.1, 0.5)
+    BENCHMARKS = ("clean_code", "is_real_code", "count_errors")
+    DEFAULT_SIZES = (1000, 10000, 100000)
+    FULL_SIZES = DEFAULT_SIZES + (1000000,)
+    # La aplicación guarda las líneas resaltadas en LineSet; set queda como referencia
+    HIGHLIGHT_STORES = {"set": set, "LineSet": LineSet}
+    # Diferencias menores a esto son ruido del temporizador en los casos pequeños
+    MIN_DELTA_SECONDS = 0.0005
+
+    def __init__(self, sizes=DEFAULT_SIZES, repeat=3, seed=0, measure_memory=True, benchmarks=BENCHMARKS):
+        self.sizes = sorted(sizes)
+        self.repeat = repeat
+        self.seed = seed
+        self.measure_memory = measure_memory
+        self.benchmarks = tuple(benchmarks)
+
+    def _measure(self, function):
+        """Ejecuta una función varias veces y retorna (mejor tiempo, mediana, pico de memoria)"""
+        times = []
+        for _ in range(self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+        peak = None
+        if self.measure_memory:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                function()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return min(times), statistics.median(times), peak
+
+    def _record(self, benchmark, profile, lines, size_bytes, function, **params):
+        best, median, peak = self._measure(function)
+        name = f"{benchmark}[{profile},{lines}" + "".join(f",{key}={value}" for key, value in params.items()) + "]"
+        return {
+            "name": name,
+            "benchmark": benchmark,
+            "profile": profile,
+            "lines": lines,
+            "bytes": size_bytes,
+            "params": params,
+            "seconds": best,
+            "median": median,
+            "lines_per_s": lines / best if best else math.inf,
+            "mb_per_s": size_bytes / best / 1e6 if best else math.inf,
+            "peak_bytes": peak,
+        }
+
+    def _cases(self):
+        """Genera los resultados de todos los casos configurados"""
+        for profile, (density, block_length) in self.PROFILES.items():
+            generator = CorpusGenerator(self.seed, density, block_length)
+            for size in self.sizes:
+                lines = generator.generate_lines(size)
+                code = "\n".join(lines)
+                size_bytes = len(code.encode("utf-8"))
+
+                if "clean_code" in self.benchmarks:
+                    yield self._record("clean_code", profile, size, size_bytes,
+                                       lambda: CodeProcessor.clean_code(code))
+
+                # Las funciones de línea no dependen de la forma de los comentarios
+                if profile != "typical":
+                    continue
+
+                if "is_real_code" in self.benchmarks:
+                    yield self._record("is_real_code", profile, size, size_bytes,
+                                       lambda: sum(map(CodeProcessor.is_real_code, lines)))
+
+                if "count_errors" in self.benchmarks:
+                    cleaned, mapping = CodeProcessor.clean_code(code)
+                    clean_lines = cleaned.split("\n")
+                    for ratio in self.HIGHLIGHT_RATIOS:
+                        marked = generator.highlight(size, ratio)
+                        marked_output = [i for i, original in enumerate(mapping) if original in marked]
+                        for store_name, store in self.HIGHLIGHT_STORES.items():
+                            highlighted, highlighted_output = store(marked), store(marked_output)
+                            yield self._record(
+                                "count_errors", profile, size, size_bytes,
+                                lambda: CodeProcessor.count_errors_in_cleaned_code(
+                                    lines, clean_lines, highlighted, highlighted_output),
+                                highlight=ratio, store=store_name,
+                            )
+
+    def run(self, progress=None):
+        """Ejecuta la suite y retorna el informe con resultados y curvas de escalado"""
+        results = []
+        for result in self._cases():
+            results.append(result)
+            if progress:
+                progress(result)
+        return {
+            "meta": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "seed": self.seed,
+                "repeat": self.repeat,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+            "scaling": self.scaling(results),
+        }
+
+    @staticmethod
+    def scaling(results):
+        """Calcula el exponente de escalado entre tamaños consecutivos de cada serie.
+
+        Un exponente cercano a 1 indica tiempo lineal en el número de líneas.
+        """
+        series = {}
+        for result in results:
+            key = result["name"].replace(f",{result['lines']}", "", 1)
+            series.setdefault(key, []).append((result["lines"], result["seconds"]))
+
+        curves = {}
+        for key, points in series.items():
+            points.sort()
+            curves[key] = [
+                {"from": n1, "to": n2, "exponent": math.log(t2 / t1) / math.log(n2 / n1)}
+                for (n1, t1), (n2, t2) in zip(points, points[1:])
+                if t1 > 0 and t2 > 0
+            ]
+        return curves
+
+    @staticmethod
+    def save(report, path):
+        """Guarda un informe como línea base en JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    @staticmethod
+    def load(path):
+        """Carga un informe guardado con save"""
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def compare(baseline, report, threshold=0.1):
+        """Retorna los casos cuyo mejor tiempo empeoró más que `threshold` respecto a la línea base"""
+        previous = {result["name"]: result for result in baseline["results"]}
+        regressions = []
+        for result in report["results"]:
+            base = previous.get(result["name"])
+            if base is None or not base["seconds"]:
+                continue
+            ratio = result["seconds"] / base["seconds"]
+            if ratio > 1 + threshold and result["seconds"] - base["seconds"] > BenchmarkSuite.MIN_DELTA_SECONDS:
+                regressions.append({
+                    "name": result["name"],
+                    "baseline": base["seconds"],
+                    "current": result["seconds"],
+                    "ratio": ratio,
+                })
+        return regressions
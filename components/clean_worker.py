@@ -0,0 +1,51 @@
+from array import array
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from core.code_processor import CodeProcessor
+from core.instrumentation import Instrumentation
+
+
+class CleanWorkerSignals(QObject):
+    """Señales con las que el worker informa al hilo de la interfaz"""
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str, object, list)
+    cancelled = pyqtSignal()
+
+
+class CleanWorker(QRunnable):
+    """Limpia el código en un hilo del QThreadPool, por bloques y cancelable"""
+
+    CHUNK_LINES = 16384
+
+    def __init__(self, code, language=None):
+        super().__init__()
+        self.code = code
+        self.language = language
+        self.signals = CleanWorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        """Pide al worker que se detenga en el próximo bloque"""
+        self._cancelled = True
+
+    @Instrumentation.timed("CleanWorker.run")
+    def run(self):
+        lines = self.code.split("\n")
+        self.code = None
+        total = max(1, -(-len(lines) // self.CHUNK_LINES))
+        cleaned_lines = []
+        line_mapping = array("I")
+        comment_spans = []
+
+        for done, (cleaned, indices, _) in enumerate(
+                CodeProcessor.iter_clean_chunks(lines, self.CHUNK_LINES, comment_spans, self.language), start=1):
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+            cleaned_lines.extend(cleaned)
+            line_mapping.extend(indices)
+            self.signals.progress.emit(done, total)
+
+        self.signals.finished.emit("\n".join(cleaned_lines), line_mapping, comment_spans)
@@ -0,0 +1,82 @@
+from core.line_index import LineIndex
+
+
+class DocumentLines:
+    """Vista de solo lectura de las líneas de un QTextDocument, sin copiar el texto"""
+
+    def __init__(self, document):
+        self.document = document
+
+    def __len__(self):
+        return self.document.blockCount()
+
+    def __getitem__(self, index):
+        return self.document.findBlockByNumber(index).text()
+
+    def __iter__(self):
+        block = self.document.firstBlock()
+        while block.isValid():
+            yield block.text()
+            block = block.next()
+
+    def lines(self, start, stop):
+        """Retorna las líneas [start, stop) recorriendo los bloques desde el primero"""
+        texts = []
+        block = self.document.findBlockByNumber(start)
+        while block.isValid() and len(texts) < stop - start:
+            texts.append(block.text())
+            block = block.next()
+        return texts
+
+
+class DocumentIndex:
+    """Índice de líneas compartido de un QTextDocument.
+
+    Las consultas de línea ↔ posición usan los bloques del documento. Para
+    leer muchas líneas se toma una copia del texto con su `LineIndex`, que se
+    construye una sola vez por versión del documento y comparten el
+    limpiador, los contadores y los resaltados: con ella cada línea es un
+    corte del texto en vez de una consulta a Qt.
+    """
+
+    # Leer más de 1/SNAPSHOT_RATIO de las líneas ya justifica copiar el texto
+    SNAPSHOT_RATIO = 8
+
+    def __init__(self, document):
+        self.document = document
+        self.blocks = DocumentLines(document)
+        self.version = 0
+        self._snapshot = None
+        self._snapshot_version = -1
+        # Debe conectarse antes que cualquier otro lector del documento
+        document.contentsChange.connect(self._on_contents_change)
+
+    def _on_contents_change(self, position, removed, added):
+        self.version += 1
+
+    def __len__(self):
+        return self.document.blockCount()
+
+    def line_at(self, position):
+        """Retorna la línea que contiene una posición del documento"""
+        return self.document.findBlock(position).blockNumber()
+
+    def offset(self, line):
+        """Retorna la posición donde empieza una línea"""
+        return self.document.findBlockByNumber(line).position()
+
+    def snapshot(self):
+        """Retorna el LineIndex del texto actual, copiándolo solo si cambió"""
+        if self._snapshot_version != self.version:
+            self._snapshot = LineIndex(self.document.toPlainText())
+            self._snapshot_version = self.version
+        return self._snapshot
+
+    def text(self):
+        return self.snapshot().text
+
+    def reader(self, reads):
+        """Retorna la vista más barata para leer unas `reads` líneas"""
+        if self._snapshot_version == self.version or reads * self.SNAPSHOT_RATIO >= len(self):
+            return self.snapshot()
+        return self.blocks
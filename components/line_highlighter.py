@@ -0,0 +1,89 @@
+from PyQt6.QtWidgets import QTextEdit
+from PyQt6.QtGui import QTextCursor, QTextCharFormat, QColor
+
+from core.line_set import LineSet
+
+
+class LineHighlighter:
+    """Construye en lote las ExtraSelections de las líneas resaltadas de un editor"""
+
+    LINE_COLOR = QColor(255, 102, 102, 100)
+
+    def __init__(self, editor):
+        self.editor = editor
+        self._selections = {}
+        self._format = QTextCharFormat()
+        self._format.setBackground(self.LINE_COLOR)
+        self._format.setProperty(QTextCharFormat.Property.FullWidthSelection, True)
+        # Las selecciones guardan cursores: si el texto cambia ya no son válidas
+        self.editor.textChanged.connect(self.invalidate)
+
+    def invalidate(self):
+        """Descarta las selecciones cacheadas tras un cambio del texto"""
+        self._selections.clear()
+
+    @staticmethod
+    def _runs(lines):
+        """Agrupa los números de línea en rangos consecutivos (inicio, fin)"""
+        if isinstance(lines, LineSet):
+            return list(lines.runs())
+        runs = []
+        start = end = None
+        for line in sorted(lines):
+            if line < 0:
+                continue
+            if end is not None and line == end + 1:
+                end = line
+                continue
+            if end is not None:
+                runs.append((start, end))
+            start = end = line
+        if end is not None:
+            runs.append((start, end))
+        return runs
+
+    def _selection(self, cursor):
+        """Crea una ExtraSelection con el formato de línea resaltada"""
+        selection = QTextEdit.ExtraSelection()
+        selection.format = self._format
+        selection.cursor = cursor
+        return selection
+
+    def _build_selections(self, document, start, end):
+        """Crea las selecciones que cubren las líneas de inicio a fin"""
+        first = document.findBlockByNumber(start)
+        if not first.isValid():
+            return []
+        last = document.findBlockByNumber(end)
+        if not last.isValid():
+            last = document.lastBlock()
+
+        # El ancho completo se pinta en las líneas cuyo salto queda seleccionado,
+        # por eso el rango llega hasta el inicio del bloque siguiente. La última
+        # línea del documento no tiene salto y se marca con un cursor vacío.
+        selections = []
+        following = last.next()
+        if following.isValid():
+            cursor = QTextCursor(first)
+            cursor.setPosition(following.position(), QTextCursor.MoveMode.KeepAnchor)
+            selections.append(self._selection(cursor))
+        else:
+            if last.blockNumber() > first.blockNumber():
+                cursor = QTextCursor(first)
+                cursor.setPosition(last.position(), QTextCursor.MoveMode.KeepAnchor)
+                selections.append(self._selection(cursor))
+            selections.append(self._selection(QTextCursor(last)))
+        return selections
+
+    def apply(self, lines):
+        """Aplica el resaltado reutilizando las selecciones de rangos sin cambios"""
+        document = self.editor.document()
+        selections = {}
+        for run in self._runs(lines):
+            run_selections = self._selections.get(run) or self._build_selections(document, *run)
+            if run_selections:
+                selections[run] = run_selections
+
+        self._selections.clear()
+        self._selections.update(selections)
+        self.editor.setExtraSelections([selection for run_selections in selections.values() for selection in run_selections])
@@ -1,12 +1,19 @@
 from PyQt6.QtWidgets import QPlainTextEdit
 from PyQt6.QtGui import QFont, QPainter, QColor
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QEvent
+
+from components.line_view import LineView
+from core.instrumentation import Instrumentation
 
 class LineNumberArea(QPlainTextEdit):
+    NUMBER_COLOR = QColor(136, 136, 136)
+    ICON_COLOR = QColor(200, 200, 0)
+
     def __init__(self, editor, parent_widget=None):
         super().__init__()
         self.editor = editor
         self.parent_widget = parent_widget
+        self._number_widths = {}
         self._setup_widget()
         self._connect_signals()
         self.clicked_line = None
@@ -18,7 +25,7 @@ class LineNumberArea(QPlainTextEdit):
         self.setFont(QFont("Consolas", 11))
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.setStyleSheet("background-color: #f5f5f5; color: #888; border: none;")
+        self.setObjectName("lineNumberArea")
 
     def _connect_signals(self):
         """Conecta las señales necesarias"""
@@ -28,55 +35,94 @@ class LineNumberArea(QPlainTextEdit):
 
     def _is_line_highlighted(self, line_number):
         """Verifica si una línea está resaltada"""
+        return line_number in self._highlighted_lines()
+
+    def _highlighted_lines(self):
+        """Retorna el conjunto de líneas resaltadas del editor asociado"""
         if not self.parent_widget:
-            return False
+            return ()
         
         if self.editor is self.parent_widget.editor:
-            return line_number in self.parent_widget.highlighted_lines
+            return self.parent_widget.highlighted_lines
         elif self.editor is self.parent_widget.output:
-            return line_number in self.parent_widget.highlighted_output_lines
-        return False
+            return self.parent_widget.highlighted_output_lines
+        return ()
+
+    def _number_width(self, number_str):
+        """Retorna el ancho del número de línea, cacheado por cantidad de dígitos"""
+        # Los dígitos tienen el mismo avance en las fuentes monoespaciadas del editor
+        width = self._number_widths.get(len(number_str))
+        if width is None:
+            width = self.fontMetrics().horizontalAdvance(number_str)
+            self._number_widths[len(number_str)] = width
+        return width
+
+    def _draw_line_numbers(self, painter, numbers, icons):
+        """Dibuja en lote los números de línea y los iconos de las líneas resaltadas"""
+        if icons:
+            painter.setPen(self.ICON_COLOR)
+            for y in icons:
+                painter.drawText(4, y, "❌")
+        painter.setPen(self.NUMBER_COLOR)
+        for x, y, number_str in numbers:
+            painter.drawText(x, y, number_str)
+
+    def _visible_lines(self, bottom):
+        """Produce (número de línea, tope) de las líneas visibles del editor asociado"""
+        editor = self.editor
+        if isinstance(editor, LineView):
+            yield from editor.visible_lines(bottom)
+            return
 
-    def _draw_line_number(self, painter, block_number, y, highlighted):
-        """Dibuja el número de línea y el icono si está resaltado"""
-        font_metrics = self.fontMetrics()
-        number_str = str(block_number + 1)
-        number_width = font_metrics.horizontalAdvance(number_str)
-        area_width = self.width()
-        number_x = area_width - number_width - 4
-        x_x = 4
-
-        if highlighted:
-            painter.setPen(QColor(200, 200, 0))
-            painter.drawText(x_x, y, "❌")
-            painter.setPen(QColor(136, 136, 136))
-            painter.drawText(number_x, y, number_str)
-        else:
-            painter.setPen(QColor(136, 136, 136))
-            painter.drawText(number_x, y, number_str)
+        # Solo se recorren los bloques visibles del editor
+        block = editor.firstVisibleBlock()
+        block_number = block.blockNumber()
+        top = editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top()
+        while block.isValid() and top <= bottom:
+            yield block_number, top
+            top += editor.blockBoundingRect(block).height()
+            block = block.next()
+            block_number += 1
+
+    def _line_top(self, line_number):
+        """Retorna la coordenada Y de una línea del editor asociado"""
+        editor = self.editor
+        if isinstance(editor, LineView):
+            return editor.line_top(line_number)
+        block = editor.document().findBlockByNumber(line_number)
+        return editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top()
 
+    @Instrumentation.timed("LineNumberArea.paintEvent")
     def paintEvent(self, event):
         super().paintEvent(event)
         painter = QPainter(self.viewport())
         font_metrics = self.fontMetrics()
-        block = self.editor.document().firstBlock()
-        block_number = 0
-
-        while block.isValid():
-            rect = self.editor.blockBoundingGeometry(block).translated(self.editor.contentOffset())
-            top = int(rect.top())
-            block_height = font_metrics.height()
-            y = top + block_height // 2 + font_metrics.ascent() // 2
-
-            highlighted = self._is_line_highlighted(block_number)
-            self._draw_line_number(painter, block_number, y, highlighted)
-            
-            block = block.next()
-            block_number += 1
+        text_offset = font_metrics.height() // 2 + font_metrics.ascent() // 2
+        area_width = self.width()
+        highlighted_lines = self._highlighted_lines()
+
+        numbers = []
+        icons = []
+        for line_number, top in self._visible_lines(event.rect().bottom()):
+            y = int(top) + text_offset
+            number_str = str(line_number + 1)
+            numbers.append((area_width - self._number_width(number_str) - 4, y, number_str))
+            if line_number in highlighted_lines:
+                icons.append(y)
+
+        self._draw_line_numbers(painter, numbers, icons)
+        painter.end()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            self._number_widths.clear()
+        super().changeEvent(event)
 
     def _get_clicked_line_number(self, y):
         """Obtiene el número de línea en la posición Y del click"""
         editor = self.editor
+        if isinstance(editor, LineView):
+            return editor.line_at(y)
         block = editor.firstVisibleBlock()
         block_number = block.blockNumber()
         top = editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top()
@@ -102,12 +148,8 @@ class LineNumberArea(QPlainTextEdit):
             return False
 
         font_metrics = self.fontMetrics()
-        editor = self.editor
-        block = editor.document().findBlockByNumber(line_number)
-        rect = editor.blockBoundingGeometry(block).translated(editor.contentOffset())
-        
         rect_x = 4
-        rect_y = int(rect.top())
+        rect_y = int(self._line_top(line_number))
         rect_w = font_metrics.horizontalAdvance("❌") + 4
         rect_h = font_metrics.height()
 
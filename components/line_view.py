@@ -0,0 +1,228 @@
+from PyQt6.QtWidgets import QAbstractScrollArea, QApplication
+from PyQt6.QtGui import QColor, QPainter, QKeySequence
+from PyQt6.QtCore import Qt, pyqtSignal
+
+from core.instrumentation import Instrumentation
+from core.line_set import LineSet
+
+
+class LineView(QAbstractScrollArea):
+    """Visor de solo lectura que pinta únicamente las líneas visibles de una lista.
+
+    Reemplaza a un QPlainTextEdit de solo lectura sin construir un
+    QTextDocument: el contenido es la lista de líneas limpias, el
+    desplazamiento vertical es por líneas y cada repintado recorre solo las
+    filas que caben en pantalla. Mantiene los nombres de señales y métodos
+    de QPlainTextEdit que usa la ventana principal.
+    """
+
+    textChanged = pyqtSignal()
+    blockCountChanged = pyqtSignal(int)
+    updateRequest = pyqtSignal()
+    # (primera línea, líneas quitadas, líneas agregadas)
+    linesChanged = pyqtSignal(int, int, int)
+
+    MARGIN = 4
+    HIGHLIGHT_COLOR = QColor(255, 102, 102, 100)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lines = []
+        self._max_length = 0
+        self._highlighted = LineSet()
+        self._selection = None
+        self._anchor = None
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.verticalScrollBar().valueChanged.connect(self._on_scroll)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+    # Contenido
+
+    def lines(self):
+        """Retorna la lista de líneas mostradas (no se copia)"""
+        return self._lines
+
+    def blockCount(self):
+        return len(self._lines)
+
+    def toPlainText(self):
+        return "\n".join(self._lines)
+
+    def setPlainText(self, text):
+        """Reemplaza todo el contenido por las líneas de un texto"""
+        self.set_lines(text.split("\n") if text else [])
+
+    def set_lines(self, lines):
+        """Reemplaza todo el contenido por una lista de líneas, sin copiarla"""
+        removed = len(self._lines)
+        self._lines = lines
+        self._max_length = max(map(len, lines), default=0)
+        self._selection = None
+        self._content_changed(0, removed, len(lines), removed)
+        self.verticalScrollBar().setValue(0)
+
+    def replace_lines(self, start, stop, new_lines):
+        """Sustituye las líneas [start, stop) por `new_lines`"""
+        old_count = len(self._lines)
+        self._lines[start:stop] = new_lines
+        self._max_length = max(self._max_length, max(map(len, new_lines), default=0))
+        self._selection = None
+        self._content_changed(start, stop - start, len(new_lines), old_count)
+
+    def _content_changed(self, start, removed, added, old_count):
+        self._update_scroll_ranges()
+        self.viewport().update()
+        self.linesChanged.emit(start, removed, added)
+        if len(self._lines) != old_count:
+            self.blockCountChanged.emit(len(self._lines))
+        self.textChanged.emit()
+
+    def set_highlighted_lines(self, lines):
+        """Indica el conjunto de líneas resaltadas (se pinta por referencia)"""
+        self._highlighted = lines
+        self.viewport().update()
+
+    # Geometría
+
+    def line_height(self):
+        return self.fontMetrics().lineSpacing()
+
+    def first_visible_line(self):
+        return self.verticalScrollBar().value()
+
+    def visible_line_count(self):
+        return max(1, (self.viewport().height() - self.MARGIN) // self.line_height())
+
+    def line_top(self, line_number):
+        """Retorna la coordenada Y de una línea relativa al viewport"""
+        return self.MARGIN + (line_number - self.first_visible_line()) * self.line_height()
+
+    def line_at(self, y):
+        """Retorna el número de línea bajo una coordenada Y del viewport"""
+        line = self.first_visible_line() + max(0, int(y) - self.MARGIN) // self.line_height()
+        return min(line, max(0, len(self._lines) - 1))
+
+    def visible_lines(self, bottom):
+        """Produce (número de línea, tope) de las líneas visibles hasta `bottom`"""
+        height = self.line_height()
+        top = self.MARGIN
+        for line_number in range(self.first_visible_line(), len(self._lines)):
+            if top > bottom:
+                return
+            yield line_number, top
+            top += height
+
+    def _update_scroll_ranges(self):
+        rows = self.visible_line_count()
+        self.verticalScrollBar().setRange(0, max(0, len(self._lines) - rows))
+        self.verticalScrollBar().setPageStep(rows)
+        text_width = self._max_length * self.fontMetrics().horizontalAdvance("M") + 2 * self.MARGIN
+        self.horizontalScrollBar().setRange(0, max(0, text_width - self.viewport().width()))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+
+    def _on_scroll(self, value):
+        self.viewport().update()
+        self.updateRequest.emit()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scroll_ranges()
+        self.updateRequest.emit()
+
+    # Pintado
+
+    @Instrumentation.timed("LineView.paintEvent")
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        metrics = self.fontMetrics()
+        height = metrics.lineSpacing()
+        width = self.viewport().width()
+        x = self.MARGIN - self.horizontalScrollBar().value()
+        selection_color = self.palette().highlight().color()
+        selected_text = self.palette().highlightedText().color()
+        text_color = self.palette().text().color()
+        highlighted = self._highlighted
+        selection = self._selection
+        lines = self._lines
+
+        painter.setPen(text_color)
+        for line_number, top in self.visible_lines(event.rect().bottom()):
+            selected = selection is not None and selection[0] <= line_number <= selection[1]
+            if selected:
+                painter.fillRect(0, top, width, height, selection_color)
+            elif line_number in highlighted:
+                painter.fillRect(0, top, width, height, self.HIGHLIGHT_COLOR)
+            if selected:
+                painter.setPen(selected_text)
+            painter.drawText(x, top + metrics.ascent(), lines[line_number].expandtabs(8))
+            if selected:
+                painter.setPen(text_color)
+        painter.end()
+
+    # Selección por líneas y copia
+
+    def selected_text(self):
+        """Retorna el texto de las líneas seleccionadas, o "" si no hay selección"""
+        if self._selection is None:
+            return ""
+        start, end = self._selection
+        return "\n".join(self._lines[start:end + 1])
+
+    def _select(self, anchor, line):
+        if not self._lines:
+            return
+        self._selection = (min(anchor, line), max(anchor, line))
+        self.viewport().update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._anchor = self.line_at(event.position().y())
+            self._select(self._anchor, self._anchor)
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._anchor is not None:
+            line = self.line_at(event.position().y())
+            if event.position().y() < 0 or event.position().y() > self.viewport().height():
+                self.ensure_line_visible(line)
+            self._select(self._anchor, line)
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._anchor = None
+        super().mouseReleaseEvent(event)
+
+    def ensure_line_visible(self, line_number):
+        """Desplaza la vista lo mínimo para que la línea quede visible"""
+        bar = self.verticalScrollBar()
+        if line_number < bar.value():
+            bar.setValue(line_number)
+        elif line_number >= bar.value() + self.visible_line_count():
+            bar.setValue(line_number - self.visible_line_count() + 1)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            if self._selection is not None:
+                QApplication.clipboard().setText(self.selected_text())
+            return
+        if event.matches(QKeySequence.StandardKey.SelectAll):
+            self._select(0, len(self._lines) - 1)
+            return
+
+        bar = self.verticalScrollBar()
+        steps = {
+            Qt.Key.Key_Up: -1,
+            Qt.Key.Key_Down: 1,
+            Qt.Key.Key_PageUp: -bar.pageStep(),
+            Qt.Key.Key_PageDown: bar.pageStep(),
+        }
+        if event.key() in steps:
+            bar.setValue(bar.value() + steps[event.key()])
+        elif event.key() == Qt.Key.Key_Home:
+            bar.setValue(bar.minimum())
+        elif event.key() == Qt.Key.Key_End:
+            bar.setValue(bar.maximum())
+        else:
+            super().keyPressEvent(event)
@@ -0,0 +1,105 @@
+from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox
+from PyQt6.QtCore import Qt, QTimer
+
+from core.instrumentation import Instrumentation
+
+
+class PerfOverlay(QFrame):
+    """Panel flotante con las latencias de los caminos calientes.
+
+    Se dibuja encima de la ventana principal, en la esquina superior derecha.
+    Mientras está visible enciende la instrumentación y refresca la tabla
+    cada `REFRESH_MS`; al ocultarse la vuelve a apagar si no estaba
+    encendida desde antes.
+    """
+
+    REFRESH_MS = 500
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("perfOverlay")
+        self._was_enabled = Instrumentation.enabled
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        self.table = QLabel()
+        self.table.setObjectName("perfTable")
+        self.table.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.reset_btn = QPushButton("Reset")
+        self.json_btn = QPushButton("Export JSON")
+        self.trace_btn = QPushButton("Export Trace")
+        for button in (self.reset_btn, self.json_btn, self.trace_btn):
+            button.setObjectName("perfButton")
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+
+        self.reset_btn.clicked.connect(self._reset)
+        self.json_btn.clicked.connect(self.export_json)
+        self.trace_btn.clicked.connect(self.export_trace)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        self.setVisible(not self.isVisible())
+
+    def showEvent(self, event):
+        self._was_enabled = Instrumentation.enabled
+        Instrumentation.enable()
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        Instrumentation.enable(self._was_enabled)
+        super().hideEvent(event)
+
+    def reposition(self):
+        """Ubica el panel en la esquina superior derecha del padre"""
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 12, 12)
+        self.raise_()
+
+    def refresh(self):
+        """Redibuja la tabla con el resumen actual de cada camino"""
+        snapshot = Instrumentation.snapshot()
+        width = max((len(name) for name in snapshot), default=4)
+        rows = [f"{'path':<{width}}  {'count':>7}  {'total':>9}  {'p50':>7}  {'p95':>7}  {'p99':>7}"]
+        for name, summary in snapshot.items():
+            rows.append(
+                f"{name:<{width}}  {summary['count']:>7}  {summary['total_ms']:9.1f}  "
+                f"{summary['p50_ms']:7.2f}  {summary['p95_ms']:7.2f}  {summary['p99_ms']:7.2f}"
+            )
+        if not snapshot:
+            rows.append("(no samples yet)")
+        self.table.setText("\n".join(rows))
+        self.adjustSize()
+        self.reposition()
+
+    def _reset(self):
+        Instrumentation.reset()
+        self.refresh()
+
+    def _export(self, title, default_name, file_filter, export):
+        """Pide un destino y exporta; un error de escritura se avisa sin cerrar la aplicación"""
+        path, _ = QFileDialog.getSaveFileName(self, title, default_name, file_filter)
+        if not path:
+            return
+        try:
+            export(path)
+        except OSError as error:
+            QMessageBox.warning(self, title, f"Could not save {path}:\n{error}")
+
+    def export_json(self):
+        self._export("Export metrics", "metrics.json", "JSON Files (*.json)", Instrumentation.export_json)
+
+    def export_trace(self):
+        self._export("Export trace", "trace.json", "Trace Files (*.json)", Instrumentation.export_chrome_trace)
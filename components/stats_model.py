@@ -0,0 +1,80 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from core.code_processor import CodeProcessor
+
+
+class StatsModel(QObject):
+    """Mantiene los contadores de líneas y errores, recalculados de forma diferida"""
+
+    updated = pyqtSignal(dict)
+
+    DELAY_MS = 30
+
+    def __init__(self, editor, output, parent_widget):
+        super().__init__(parent_widget)
+        self.editor = editor
+        self.output = output
+        self.parent_widget = parent_widget
+        self.stats = {
+            "total_lines": 0,
+            "selected_lines": 0,
+            "clean_lines": 0,
+            "deleted_lines": 0,
+            "errors": 0,
+        }
+        self._errors_dirty = True
+
+        # Todas las notificaciones de una misma ráfaga se resuelven en un único recálculo
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DELAY_MS)
+        self._timer.timeout.connect(self.refresh)
+
+        self.editor.document().contentsChange.connect(self._on_editor_change)
+        self.output.linesChanged.connect(self._on_output_change)
+
+    def _on_editor_change(self, position, removed, added):
+        index = self.parent_widget.editor_index
+        self._note_change(self.parent_widget.highlighted_lines, len(index), self.stats["total_lines"],
+                          index.line_at(position), index.line_at(position + added))
+
+    def _on_output_change(self, first, removed, added):
+        self._note_change(self.parent_widget.highlighted_output_lines, self.output.blockCount(),
+                          self.stats["clean_lines"], first, first + max(added - 1, 0))
+
+    def _note_change(self, highlighted_lines, line_count, known_lines, first, last):
+        """Marca los errores como pendientes solo si el cambio puede afectarlos"""
+        if not self._errors_dirty:
+            if line_count != known_lines:
+                self._errors_dirty = True
+            else:
+                # Una llave de cierre resaltada depende también de la línea anterior
+                self._errors_dirty = any(line in highlighted_lines for line in range(first, last + 2))
+        self._timer.start()
+
+    def invalidate_errors(self):
+        """Marca el conteo de errores como pendiente y programa un recálculo"""
+        self._errors_dirty = True
+        self._timer.start()
+
+    def refresh(self):
+        """Recalcula los contadores pendientes y notifica el resultado"""
+        self._timer.stop()
+        widget = self.parent_widget
+        output_lines = self.output.lines()
+
+        if self._errors_dirty:
+            # Cada línea marcada lee su texto y, si es una llave, el de la anterior
+            editor_lines = widget.editor_index.reader(2 * len(widget.highlighted_lines))
+            self.stats["errors"] = CodeProcessor.count_errors_in_cleaned_code(
+                editor_lines, output_lines, widget.highlighted_lines, widget.highlighted_output_lines
+            )
+            self._errors_dirty = False
+
+        total_lines = len(widget.editor_index)
+        clean_lines = len(output_lines)
+        self.stats["total_lines"] = total_lines
+        self.stats["selected_lines"] = len(widget.highlighted_lines)
+        self.stats["clean_lines"] = clean_lines
+        self.stats["deleted_lines"] = max(0, total_lines - clean_lines)
+        self.updated.emit(dict(self.stats))
@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+
+from core.batch import BatchCleaner
+from core.languages import LanguageRegistry
+from core.watch import WatchCleaner
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="Remove comments and empty lines from source files without opening the GUI.",
+    )
+    parser.add_argument("paths", nargs="+", help="files, directories or glob patterns to clean")
+    parser.add_argument("-o", "--output-dir", default="cleaned",
+                        help="directory for cleaned files (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("-e", "--extensions", default=",".join(BatchCleaner.DEFAULT_EXTENSIONS),
+                        help="comma-separated extensions picked up when walking directories")
+    parser.add_argument("--no-maps", action="store_true",
+                        help=f"do not write the {BatchCleaner.MAP_SUFFIX} line mapping next to each output")
+    parser.add_argument("--encoding", default="utf-8", help="source encoding (default: %(default)s)")
+    parser.add_argument("-l", "--language", choices=LanguageRegistry.names(),
+                        help="comment syntax of every file (default: detect per file by extension or content)")
+    parser.add_argument("-w", "--watch", action="store_true",
+                        help="keep running and re-clean files whenever their content changes")
+    parser.add_argument("--debounce", type=float, default=WatchCleaner.DEBOUNCE * 1000,
+                        help="milliseconds without new writes before re-cleaning (default: %(default)g)")
+    parser.add_argument("--poll", action="store_true",
+                        help="poll file stats instead of using inotify")
+    return parser
+
+
+def watch(cleaner, args):
+    """Limpia todo una vez y después vuelve a limpiar los archivos que cambian"""
+    watcher = WatchCleaner(cleaner, args.paths, debounce=args.debounce / 1000, use_inotify=not args.poll)
+    try:
+        cleaned, errors = watcher.start()
+        print(f"Cleaned {len(cleaned)} files; watching for changes "
+              f"({'inotify' if watcher.uses_inotify else 'polling'}), Ctrl+C to stop", flush=True)
+
+        def report(cleaned, errors, seconds):
+            for source, error in errors.items():
+                print(f"error: {source}: {error}", file=sys.stderr)
+            if cleaned:
+                names = ", ".join(cleaned[:5]) + (f" and {len(cleaned) - 5} more" if len(cleaned) > 5 else "")
+                print(f"Re-cleaned {names} in {seconds * 1000:.0f} ms", flush=True)
+
+        report([], errors, 0.0)
+        watcher.run(report)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        print("error: --workers must be at least 1", file=sys.stderr)
+        return 2
+
+    cleaner = BatchCleaner(
+        args.output_dir,
+        workers=args.workers,
+        extensions=[ext if ext.startswith(".") else "." + ext for ext in args.extensions.split(",") if ext],
+        write_maps=not args.no_maps,
+        encoding=args.encoding,
+        language=args.language,
+    )
+    try:
+        if args.watch:
+            return watch(cleaner, args)
+        summary = cleaner.run(args.paths)
+    except (FileNotFoundError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+    print(f"Cleaned {summary['files']} files: {summary['original_lines']} -> "
+          f"{summary['clean_lines']} lines in {summary['seconds']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import contextlib
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.code_processor import CodeProcessor
+from core.languages import LanguageRegistry
+from core.sharded import ShardedCleaner
+
+
+class BatchCleaner:
+    """Limpia árboles de código fuente en paralelo sin depender de la interfaz"""
+
+    DEFAULT_EXTENSIONS = tuple(LanguageRegistry.extensions())
+    MAP_SUFFIX = ".map.json"
+    # Los archivos más grandes se reparten entre todos los procesos
+    SHARD_FILE_BYTES = 64 << 20
+    MAP_WRITE_LINES = 65536
+
+    def __init__(self, output_dir, workers=None, extensions=DEFAULT_EXTENSIONS,
+                 write_maps=True, encoding="utf-8", language=None):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.extensions = tuple(extensions)
+        self.write_maps = write_maps
+        self.encoding = encoding
+        self.language = language
+
+    @staticmethod
+    def _glob_root(pattern):
+        """Retorna la parte fija de un glob, usada como raíz de las rutas relativas"""
+        parts = []
+        for part in pattern.replace(os.sep, "/").split("/"):
+            if glob.has_magic(part):
+                break
+            parts.append(part)
+        return "/".join(parts) or "."
+
+    def collect_files(self, paths):
+        """Expande archivos, directorios y globs en pares (ruta, ruta relativa).
+
+        Las rutas relativas son únicas: si dos archivos caerían en la misma
+        salida, se usa su ruta desde el directorio común a ambos.
+        """
+        output_dir = os.path.realpath(self.output_dir)
+        files = {}
+        seen = set()
+
+        def add(source, relative):
+            real = os.path.realpath(source)
+            if real not in seen:
+                seen.add(real)
+                files[source] = relative
+
+        for path in paths:
+            if glob.has_magic(path):
+                # No volver a limpiar los resultados de una ejecución anterior
+                matches = [match for match in glob.glob(path, recursive=True)
+                           if not self._inside(os.path.realpath(match), output_dir)]
+                root = self._glob_root(path)
+            else:
+                matches = [path]
+                root = None
+
+            for match in matches:
+                if os.path.isdir(match):
+                    for current, dirs, names in os.walk(match):
+                        dirs[:] = sorted(d for d in dirs if os.path.realpath(os.path.join(current, d)) != output_dir)
+                        for name in sorted(names):
+                            if name.endswith(self.extensions):
+                                full = os.path.join(current, name)
+                                add(full, os.path.relpath(full, root or match))
+                elif os.path.isfile(match):
+                    add(match, os.path.relpath(match, root) if root else os.path.basename(match))
+                else:
+                    raise FileNotFoundError(f"No such file or directory: {match}")
+        return list(self._unique_targets(files).items())
+
+    @staticmethod
+    def _inside(path, directory):
+        return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+    @staticmethod
+    def _unique_targets(files):
+        """Reemplaza las rutas relativas repetidas por la ruta desde el directorio común"""
+        groups = {}
+        for source, relative in files.items():
+            groups.setdefault(os.path.normcase(os.path.normpath(relative)), []).append(source)
+        for sources in groups.values():
+            if len(sources) > 1:
+                absolute = [os.path.abspath(source) for source in sources]
+                common = os.path.commonpath(absolute)
+                for source, full in zip(sources, absolute):
+                    files[source] = os.path.relpath(full, common)
+
+        targets = {}
+        for source, relative in files.items():
+            other = targets.setdefault(os.path.normcase(os.path.normpath(relative)), source)
+            if other != source:
+                raise ValueError(f"{other} and {source} would both be written to {relative}")
+        return files
+
+    @staticmethod
+    def clean_file(job):
+        """Limpia un archivo por bloques y escribe el resultado y su mapeo de líneas.
+
+        Sin lenguaje en el trabajo, se detecta por archivo.
+        """
+        source, target, write_map, encoding, language = job
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+
+        original_lines = 0
+        clean_lines = 0
+        with contextlib.ExitStack() as stack:
+            out = stack.enter_context(open(target, "w", encoding=encoding, errors="surrogateescape"))
+            map_file = None
+            if write_map:
+                map_file = stack.enter_context(open(target + BatchCleaner.MAP_SUFFIX, "w", encoding="utf-8"))
+                map_file.write('{"source":%s,"line_mapping":[' % json.dumps(source))
+
+            for cleaned, indices, read in CodeProcessor.iter_clean_file(source, encoding, language):
+                original_lines += read
+                if not cleaned:
+                    continue
+                separator = "\n" if clean_lines else ""
+                out.write(separator + "\n".join(cleaned))
+                if map_file:
+                    map_file.write(("," if clean_lines else "") + ",".join(map(str, indices)))
+                clean_lines += len(cleaned)
+
+            if map_file:
+                map_file.write("]}")
+
+        return original_lines, clean_lines
+
+    def clean_file_sharded(self, job):
+        """Limpia un archivo enorme repartiendo sus líneas entre todos los procesos"""
+        source, target, write_map, encoding, language = job
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        original_lines, mapping = ShardedCleaner(self.workers, language).clean_file(source, target, encoding)
+        if write_map:
+            with open(target + self.MAP_SUFFIX, "w", encoding="utf-8") as map_file:
+                map_file.write('{"source":%s,"line_mapping":[' % json.dumps(source))
+                for start in range(0, len(mapping), self.MAP_WRITE_LINES):
+                    map_file.write(("," if start else "") + ",".join(map(str, mapping[start:start + self.MAP_WRITE_LINES])))
+                map_file.write("]}")
+        return original_lines, len(mapping)
+
+    def _shardable(self, job):
+        """Indica si conviene limpiar un archivo por fragmentos en varios procesos"""
+        source, _, _, encoding, _ = job
+        return (self.workers > 1 and "\n".encode(encoding) == b"\n"
+                and os.path.getsize(source) >= self.SHARD_FILE_BYTES)
+
+    def run(self, paths):
+        """Limpia todos los archivos indicados y retorna un resumen"""
+        start = time.perf_counter()
+        jobs = [
+            (source, os.path.join(self.output_dir, relative), self.write_maps, self.encoding, self.language)
+            for source, relative in self.collect_files(paths)
+        ]
+
+        huge = [job for job in jobs if self._shardable(job)]
+        small = [job for job in jobs if job not in huge]
+        results = list(map(self.clean_file_sharded, huge))
+        if self.workers == 1 or len(small) <= 1:
+            results += map(self.clean_file, small)
+        else:
+            # Trozos grandes para que 20k archivos pequeños no se crucen de a uno
+            chunksize = max(1, len(small) // (self.workers * 8))
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results += executor.map(self.clean_file, small, chunksize=chunksize)
+
+        return {
+            "files": len(jobs),
+            "original_lines": sum(original for original, _ in results),
+            "clean_lines": sum(clean for _, clean in results),
+            "seconds": time.perf_counter() - start,
+        }
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from collections import OrderedDict
+
+from core.source_file import NEW_FILE_MODE
+
+
+class ResultCache:
+    """Caché LRU de resultados de limpieza indexada por el hash del contenido.
+
+    Guarda el texto limpio, el mapeo de líneas y los rangos de comentarios
+    de bloque. Opcionalmente persiste cada
+    resultado en `directory` para reutilizarlo entre sesiones, descartando los
+    archivos menos usados cuando el directorio supera `max_disk_bytes`. Los
+    resultados se comparten entre llamadas y no deben modificarse.
+    """
+
+    SUFFIX = ".json"
+
+    def __init__(self, max_entries=32, max_bytes=256 << 20, directory=None, max_disk_bytes=1 << 30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(code, language=None):
+        """Calcula la llave de caché de un texto limpiado con un lenguaje dado"""
+        person = (language or "").encode("utf-8")[:hashlib.blake2b.PERSON_SIZE]
+        return hashlib.blake2b(code.encode("utf-8", "surrogatepass"), digest_size=16, person=person).hexdigest()
+
+    def get(self, code, key=None):
+        """Retorna (texto limpio, mapeo, rangos) si el texto ya fue limpiado, o None"""
+        key = key or self.key(code)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            return result
+
+        result = self._load(key)
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def put(self, code, cleaned, line_mapping, comment_spans, key=None):
+        """Guarda el resultado de limpiar un texto"""
+        key = key or self.key(code)
+        result = (cleaned, line_mapping, comment_spans)
+        self._remember(key, result)
+        self._store(key, result)
+
+    def clear(self):
+        """Vacía la caché en memoria (los archivos en disco se conservan)"""
+        self._entries.clear()
+        self._sizes.clear()
+        self._total_bytes = 0
+
+    def _remember(self, key, result):
+        """Agrega un resultado en memoria y descarta los menos usados si sobra"""
+        if key in self._entries:
+            self._total_bytes -= self._sizes[key]
+        size = len(result[0]) + result[1].itemsize * len(result[1]) + 24 * len(result[2])
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._total_bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            old_key, _ = self._entries.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(old_key)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _load(self, key):
+        """Lee un resultado persistido, o None si no existe o está dañado"""
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8", errors="surrogatepass") as f:
+                data = json.load(f)
+            result = data["cleaned"], array("I", data["line_mapping"]), data.get("comment_spans", [])
+            if not isinstance(result[0], str) or not isinstance(result[2], list):
+                raise TypeError(key)
+            os.utime(path)
+        except OSError:
+            return None
+        except (ValueError, KeyError, TypeError, OverflowError):
+            # Un archivo dañado se descarta para no volver a leerlo
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return result
+
+    def _store(self, key, result):
+        """Escribe un resultado en disco de forma atómica"""
+        if not self.directory:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.chmod(tmp_path, NEW_FILE_MODE)
+            with os.fdopen(fd, "w", encoding="utf-8", errors="surrogatepass") as f:
+                json.dump({"cleaned": result[0], "line_mapping": list(result[1]), "comment_spans": list(result[2])},
+                          f, separators=(",", ":"))
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Elimina los archivos usados hace más tiempo hasta respetar max_disk_bytes"""
+        files = []
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(self.SUFFIX) and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -1,23 +1,50 @@
-import re
+from collections import Counter
+
+from core.instrumentation import Instrumentation
+from core.languages import LanguageRegistry
+
+READ_BUFFER_SIZE = 1 << 20
 
 class CodeProcessor:
     """Maneja la lógica de limpieza y procesamiento de código"""
+
+    _lexer = LanguageRegistry.lexer(LanguageRegistry.DEFAULT)
+
+    @staticmethod
+    def lexer(language=None):
+        """Retorna el lexer de un lenguaje registrado (C si no se indica)"""
+        return LanguageRegistry.lexer(language) if language else CodeProcessor._lexer
     
     @staticmethod
-    def clean_code(code):
+    @Instrumentation.timed("CodeProcessor.clean_code")
+    def clean_code(code, language=None):
         """Limpia el código removiendo comentarios y líneas vacías"""
-        orig_lines = code.split('\n')
-        cleaned_lines = []
-        line_mapping = []
+        return CodeProcessor.lexer(language).clean(code)
 
-        for idx, line in enumerate(orig_lines):
-            line_sin_comentario = re.sub(r'//.*$', '', line)
-            line_sin_comentario = re.sub(r'/\*.*?\*/', '', line_sin_comentario)
-            if line_sin_comentario.strip():
-                cleaned_lines.append(line_sin_comentario.strip())
-                line_mapping.append(idx)
+    @staticmethod
+    def iter_clean(lines, language=None):
+        """Limpia un iterable de líneas produciendo pares (línea limpia, índice original)"""
+        return CodeProcessor.lexer(language).iter_clean(lines)
 
-        return '\n'.join(cleaned_lines), line_mapping
+    @staticmethod
+    def iter_clean_chunks(lines, chunk_lines=None, spans=None, language=None):
+        """Limpia un iterable de líneas por bloques (líneas limpias, índices, líneas leídas)"""
+        return CodeProcessor.lexer(language).iter_chunks(lines, chunk_lines, spans)
+
+    @staticmethod
+    def iter_clean_file(path, encoding="utf-8", language=None):
+        """Limpia un archivo por bloques leyéndolo con un buffer, con memoria constante.
+
+        Sin `language`, el lenguaje se elige por la extensión o, si no se
+        conoce, por el comienzo del archivo.
+        """
+        with open(path, encoding=encoding, errors="surrogateescape", buffering=READ_BUFFER_SIZE) as f:
+            if language is None:
+                language = LanguageRegistry.for_path(path)
+            if language is None:
+                language = LanguageRegistry.sniff(f.read(LanguageRegistry.SNIFF_CHARS))
+                f.seek(0)
+            yield from CodeProcessor.lexer(language).iter_chunks(f)
 
     @staticmethod
     def is_real_code(line):
@@ -32,28 +59,46 @@ class CodeProcessor:
         return True
 
     @staticmethod
+    def _index_highlighted_output(clean_lines, highlighted_output_lines):
+        """Indexa por contenido las líneas limpias resaltadas"""
+        por_contenido = Counter()
+        por_cierre = Counter()
+        total = len(clean_lines)
+
+        for idx in highlighted_output_lines:
+            if 0 <= idx < total:
+                content = clean_lines[idx].strip()
+                if content == "}":
+                    # Una llave de cierre se identifica por la línea que la precede
+                    if idx >= 1:
+                        por_cierre[clean_lines[idx-1].strip()] += 1
+                else:
+                    por_contenido[content] += 1
+
+        return por_contenido, por_cierre
+
+    @staticmethod
+    @Instrumentation.timed("CodeProcessor.count_errors_in_cleaned_code")
     def count_errors_in_cleaned_code(orig_lines, clean_lines, highlighted_lines, highlighted_output_lines):
         """Cuenta los errores encontrados en el código limpio"""
-        errores_editor = 0
-        matched_output_lines = set()
-        
+        disponibles, cierres_disponibles = CodeProcessor._index_highlighted_output(
+            clean_lines, highlighted_output_lines
+        )
+        buscados = Counter()
+        cierres_buscados = Counter()
+        total = len(orig_lines)
+
         for i in highlighted_lines:
-            if 0 <= i < len(orig_lines) and CodeProcessor.is_real_code(orig_lines[i]):
+            if 0 <= i < total and CodeProcessor.is_real_code(orig_lines[i]):
                 content = orig_lines[i].strip()
                 if content == "}":
                     if i-1 in highlighted_lines and i-1 >= 0:
-                        prev_content = orig_lines[i-1].strip()
-                        for idx in range(1, len(clean_lines)):
-                            if clean_lines[idx].strip() == "}" and clean_lines[idx-1].strip() == prev_content:
-                                if idx in highlighted_output_lines and idx not in matched_output_lines:
-                                    errores_editor += 1
-                                    matched_output_lines.add(idx)
-                                    break
+                        cierres_buscados[orig_lines[i-1].strip()] += 1
                 else:
-                    for idx, line in enumerate(clean_lines):
-                        if line.strip() == content and idx in highlighted_output_lines and idx not in matched_output_lines:
-                            errores_editor += 1
-                            matched_output_lines.add(idx)
-                            break
+                    buscados[content] += 1
 
-        return errores_editor
\ No newline at end of file
+        # Cada línea marcada consume como mucho una línea limpia resaltada con el
+        # mismo contenido, así que por contenido se emparejan min(buscadas, disponibles)
+        errores_editor = sum(min(n, disponibles[content]) for content, n in buscados.items())
+        errores_editor += sum(min(n, cierres_disponibles[prev]) for prev, n in cierres_buscados.items())
+        return errores_editor
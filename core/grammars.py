@@ -0,0 +1,114 @@
+class CommentGrammar:
+    """Describe los comentarios y cadenas de un lenguaje.
+
+    - `line_comments`: marcadores que comentan hasta el final de la línea.
+    - `block_comments`: pares (apertura, cierre) que pueden cruzar líneas.
+    - `strings`: comillas de cadenas de una sola línea, con escapes "\\".
+    - `multiline_strings`: pares (apertura, cierre) de cadenas que pueden
+      cruzar líneas; su contenido se conserva.
+    - `word_comments`: los comentarios de línea solo empiezan al inicio de una
+      palabra (como "#" en shell, donde "$#" no es un comentario).
+    - `interpreters` y `sniff_patterns`: pistas para reconocer el lenguaje por
+      la línea "#!" o por el contenido cuando no hay extensión.
+    """
+
+    def __init__(self, name, line_comments=(), block_comments=(), strings=('"', "'"),
+                 multiline_strings=(), extensions=(), word_comments=False,
+                 interpreters=(), sniff_patterns=()):
+        self.name = name
+        self.line_comments = tuple(line_comments)
+        self.block_comments = tuple(block_comments)
+        self.strings = tuple(strings)
+        self.multiline_strings = tuple(multiline_strings)
+        self.extensions = tuple(extensions)
+        self.word_comments = word_comments
+        self.interpreters = tuple(interpreters)
+        self.sniff_patterns = tuple(sniff_patterns)
+
+    def __repr__(self):
+        return f"CommentGrammar({self.name!r})"
+
+
+C = CommentGrammar(
+    "c",
+    line_comments=("//",),
+    block_comments=(("/*", "*/"),),
+    extensions=(".c", ".h", ".cc", ".cpp", ".cxx", ".hpp", ".hh", ".java", ".js", ".jsx", ".mjs",
+                ".ts", ".tsx", ".cs", ".go", ".kt", ".scala", ".swift", ".rs", ".php", ".css"),
+    interpreters=("node",),
+    sniff_patterns=(
+        r"^\s*#\s*(?:include|define|ifn?def|pragma)\b",
+        r"^\s*//",
+        r"^\s*/\*",
+        r"[;{]\s*$",
+    ),
+)
+
+PYTHON = CommentGrammar(
+    "python",
+    line_comments=("#",),
+    multiline_strings=(('"""', '"""'), ("'''", "'''")),
+    extensions=(".py", ".pyw", ".pyi"),
+    interpreters=("python",),
+    sniff_patterns=(
+        r"^\s*(?:def|class)\s+\w+.*:\s*$",
+        r"^\s*(?:import\s+\w|from\s+[\w.]+\s+import\b)",
+        r"^\s*(?:if|elif|else|for|while|try|except|with)\b.*:\s*$",
+        r"^\s*(?:\"\"\"|''')",
+    ),
+)
+
+SQL = CommentGrammar(
+    "sql",
+    line_comments=("--",),
+    block_comments=(("/*", "*/"),),
+    extensions=(".sql",),
+    sniff_patterns=(
+        r"(?i)^\s*(?:select|insert\s+into|update|delete\s+from|create|alter|drop)\b",
+        r"(?i)^\s*(?:from|where|join|group\s+by|order\s+by)\b",
+        r"^\s*--",
+    ),
+)
+
+SHELL = CommentGrammar(
+    "shell",
+    line_comments=("#",),
+    extensions=(".sh", ".bash", ".zsh", ".ksh"),
+    word_comments=True,
+    interpreters=("sh", "bash", "zsh", "ksh", "dash"),
+    sniff_patterns=(
+        r"^\s*(?:echo|export|fi|then|done|esac|source)\b",
+        r"\$\{?\w+",
+        r"^\s*\w+=\S",
+    ),
+)
+
+# En HTML las comillas sueltas del texto ("don't") no abren cadenas
+HTML = CommentGrammar(
+    "html",
+    block_comments=(("<!--", "-->"),),
+    strings=(),
+    extensions=(".html", ".htm", ".xhtml", ".xml", ".svg", ".vue"),
+    sniff_patterns=(
+        r"(?i)^\s*<!DOCTYPE",
+        r"^\s*<\?xml",
+        r"^\s*</?[A-Za-z][\w-]*(?:\s[^>]*)?>",
+        r"^\s*<!--",
+    ),
+)
+
+LUA = CommentGrammar(
+    "lua",
+    line_comments=("--",),
+    block_comments=(("--[[", "]]"),),
+    extensions=(".lua",),
+    interpreters=("lua", "luajit"),
+    sniff_patterns=(
+        r"^\s*local\s+\w+",
+        r"^\s*(?:local\s+)?function\b",
+        r"^\s*end\b",
+        r"^\s*--",
+    ),
+)
+
+BUILTIN_GRAMMARS = (C, PYTHON, SQL, SHELL, HTML, LUA)
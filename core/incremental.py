@@ -0,0 +1,107 @@
+from bisect import bisect_left, bisect_right
+from itertools import compress, count
+
+from core.code_processor import CodeProcessor
+from core.line_map import LineMap
+
+
+class IncrementalCleaner:
+    """Mantiene el resultado de una limpieza y lo actualiza solo en la región editada.
+
+    Además del mapeo bidireccional de líneas (LineMap) guarda los rangos
+    (inicio, fin, estado) de líneas que empiezan dentro de un comentario de
+    bloque o de una cadena multilínea. Con ellos se conoce el estado del lexer al inicio de cualquier
+    línea sin volver a recorrer el documento.
+    """
+
+    CHUNK_LINES = 512
+
+    def __init__(self, line_mapping, comment_spans, line_count, language=None):
+        self.line_map = LineMap(line_mapping, line_count)
+        self.comment_spans = [tuple(span) for span in comment_spans]
+        self.language = language
+        self._lexer = CodeProcessor.lexer(language)
+
+    @property
+    def line_mapping(self):
+        return self.line_map.clean_to_original
+
+    @property
+    def line_count(self):
+        return self.line_map.line_count
+
+    @classmethod
+    def from_lines(cls, lines, language=None):
+        """Limpia una lista de líneas completa y retorna (motor, líneas limpias)"""
+        spans = []
+        lines = list(lines)
+        CodeProcessor.lexer(language).strip_lines(lines, None, spans)
+        lines = list(map(str.strip, lines))
+        cleaner = cls(compress(count(), lines), spans, len(lines), language)
+        return cleaner, list(filter(None, lines))
+
+    def state_at(self, line):
+        """Retorna el estado del lexer al inicio de una línea"""
+        k = bisect_right(self.comment_spans, (line, float("inf"))) - 1
+        if k >= 0:
+            start, stop, state = self.comment_spans[k]
+            if start <= line < stop:
+                return state
+        return None
+
+    def apply_edit(self, lines, first, old_stop, new_stop):
+        """Actualiza el resultado tras reemplazar las líneas [first, old_stop) por [first, new_stop).
+
+        `lines` es el documento ya editado (cualquier secuencia indexable). Se
+        vuelve a lexear desde `first` hasta pasar la edición y que el estado del
+        lexer coincida con el que había antes. Retorna (inicio, fin, líneas
+        nuevas): las líneas limpias [inicio, fin) de la salida anterior deben
+        reemplazarse por las líneas nuevas.
+        """
+        delta = new_stop - old_stop
+        total = len(lines)
+        state = self.state_at(first)
+        new_spans = []
+        new_lines = []
+        new_indices = []
+
+        position = first
+        while position < total:
+            chunk = [lines[i] for i in range(position, min(position + self.CHUNK_LINES, total))]
+            state = self._lexer.strip_lines(chunk, state, new_spans, position)
+            chunk = list(map(str.strip, chunk))
+            new_lines.extend(filter(None, chunk))
+            new_indices.extend(compress(count(position), chunk))
+            position += len(chunk)
+            # Pasada la edición, si el estado coincide con el anterior el resto no cambia
+            if position >= new_stop and position - delta < self.line_count and state == self.state_at(position - delta):
+                break
+
+        old_end = position - delta
+
+        lo = self.line_map.first_clean_from(first)
+        hi = self.line_map.first_clean_from(old_end)
+        self.line_map.replace(first, old_end, position, lo, hi, new_indices)
+
+        self._patch_spans(first, old_end, delta, new_spans)
+        return lo, hi, new_lines
+
+    def _patch_spans(self, first, old_end, delta, new_spans):
+        """Reemplaza los rangos de comentario de la región re-lexeada"""
+        spans = self.comment_spans
+        before = spans[:bisect_left(spans, (first,))]
+        if before and before[-1][1] > first:
+            start, stop, state = before[-1]
+            before[-1] = (start, first, state)
+
+        after = spans[bisect_left(spans, (old_end,)):]
+        k = bisect_left(spans, (old_end,)) - 1
+        if k >= 0 and spans[k][1] > old_end and spans[k][0] < old_end:
+            after.insert(0, (old_end, spans[k][1], spans[k][2]))
+        if delta:
+            after = [(start + delta, stop + delta, state) for start, stop, state in after]
+
+        merged = before
+        for start, stop, state in new_spans + after:
+            self._lexer.add_span(merged, start, stop, state)
+        self.comment_spans = merged
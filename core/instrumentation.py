@@ -0,0 +1,164 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class PathStats:
+    """Estadísticas de un camino caliente: conteo y total acumulados, percentiles recientes"""
+
+    __slots__ = ("count", "total", "samples", "_lock")
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+        # El hilo de limpieza agrega muestras mientras la interfaz arma el resumen
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.samples.append(seconds)
+
+    @staticmethod
+    def percentile(ordered, fraction):
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self):
+        """Retorna conteo, total y latencias p50/p95/p99/máxima en milisegundos"""
+        with self._lock:
+            count, total, samples = self.count, self.total, list(self.samples)
+        ordered = sorted(samples)
+        return {
+            "count": count,
+            "total_ms": total * 1000,
+            "p50_ms": self.percentile(ordered, 0.50) * 1000,
+            "p95_ms": self.percentile(ordered, 0.95) * 1000,
+            "p99_ms": self.percentile(ordered, 0.99) * 1000,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+        }
+
+
+class _Timer:
+    """Mide un bloque `with` y lo registra al salir"""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        Instrumentation.record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    """Temporizador vacío que se usa mientras la instrumentación está apagada"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class Instrumentation:
+    """Temporizadores de los caminos calientes, casi gratis mientras están apagados.
+
+    `timed` decora funciones y `timer` mide bloques `with`; apagado, cada uno
+    cuesta solo la consulta de `enabled`. Encendido, cada llamada suma a un
+    conteo y a un total acumulados, guarda su duración en una ventana de las
+    últimas `WINDOW` llamadas (para p50/p95/p99) y agrega un evento a la traza,
+    exportable como JSON o en el formato de trazas de Chrome.
+    """
+
+    ENV_VAR = "CODE_CLEANER_INSTRUMENT"
+    WINDOW = 2048
+    MAX_EVENTS = 100000
+
+    enabled = bool(os.environ.get(ENV_VAR))
+    _stats = {}
+    _events = deque(maxlen=MAX_EVENTS)
+    _origin = time.perf_counter()
+    _null_timer = _NullTimer()
+
+    @classmethod
+    def enable(cls, enabled=True):
+        cls.enabled = enabled
+
+    @classmethod
+    def timed(cls, name):
+        """Decorador que mide cada llamada de la función bajo `name`"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    cls.record(name, start, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def timer(cls, name):
+        """Retorna un contexto `with` que mide el bloque bajo `name`"""
+        return _Timer(name) if cls.enabled else cls._null_timer
+
+    @classmethod
+    def record(cls, name, start, seconds):
+        """Registra una medición que empezó en `start` (perf_counter) y duró `seconds`"""
+        stats = cls._stats.get(name)
+        if stats is None:
+            stats = cls._stats.setdefault(name, PathStats(cls.WINDOW))
+        stats.add(seconds)
+        cls._events.append((name, start, seconds, threading.get_ident()))
+
+    @classmethod
+    def reset(cls):
+        cls._stats.clear()
+        cls._events.clear()
+
+    @classmethod
+    def snapshot(cls):
+        """Retorna {camino: resumen} ordenado por tiempo total, de mayor a menor"""
+        summaries = {name: stats.summary() for name, stats in list(cls._stats.items())}
+        return dict(sorted(summaries.items(), key=lambda item: -item[1]["total_ms"]))
+
+    @classmethod
+    def export_json(cls, path):
+        """Escribe el resumen de cada camino en un archivo JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cls.snapshot(), f, indent=2)
+
+    @classmethod
+    def export_chrome_trace(cls, path):
+        """Escribe los eventos en el formato de trazas de Chrome (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - cls._origin) * 1e6,
+                "dur": seconds * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, seconds, tid in list(cls._events)
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
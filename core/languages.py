@@ -0,0 +1,89 @@
+import os
+import re
+
+from core.grammars import BUILTIN_GRAMMARS
+from core.lexer import CommentLexer
+
+
+class LanguageRegistry:
+    """Registro de gramáticas de comentarios, cada una compilada una sola vez.
+
+    El lenguaje de un texto se elige por la extensión del archivo y, si no la
+    hay o no se conoce, por la línea "#!" o puntuando los patrones de cada
+    gramática sobre las primeras líneas.
+    """
+
+    DEFAULT = "c"
+    SNIFF_CHARS = 8192
+
+    _grammars = {}
+    _lexers = {}
+    _extensions = {}
+    _sniffers = {}
+
+    @classmethod
+    def register(cls, grammar):
+        """Deja una gramática disponible por nombre y extensión; se compila al primer uso"""
+        cls._lexers.pop(grammar.name, None)
+        cls._grammars[grammar.name] = grammar
+        for extension in grammar.extensions:
+            cls._extensions[extension.lower()] = grammar.name
+        cls._sniffers[grammar.name] = [re.compile(pattern, re.MULTILINE) for pattern in grammar.sniff_patterns]
+
+    @classmethod
+    def names(cls):
+        return list(cls._grammars)
+
+    @classmethod
+    def extensions(cls):
+        return list(cls._extensions)
+
+    @classmethod
+    def get(cls, name):
+        try:
+            return cls._grammars[name]
+        except KeyError:
+            raise ValueError(f"unknown language: {name}") from None
+
+    @classmethod
+    def lexer(cls, name=None):
+        """Retorna el lexer compilado de un lenguaje, compilándolo una sola vez"""
+        name = name or cls.DEFAULT
+        lexer = cls._lexers.get(name)
+        if lexer is None:
+            lexer = cls._lexers[name] = CommentLexer(cls.get(name))
+        return lexer
+
+    @classmethod
+    def for_path(cls, path):
+        """Retorna el lenguaje asociado a la extensión de un archivo, o None"""
+        return cls._extensions.get(os.path.splitext(path)[1].lower())
+
+    @classmethod
+    def sniff(cls, text):
+        """Adivina el lenguaje de un texto por su línea "#!" o por su contenido"""
+        sample = text[:cls.SNIFF_CHARS]
+        if sample.startswith("#!"):
+            command = os.path.basename(sample[2:].split("\n", 1)[0].strip().replace("/usr/bin/env ", ""))
+            for name, grammar in cls._grammars.items():
+                if any(command.startswith(interpreter) for interpreter in grammar.interpreters):
+                    return name
+
+        scores = {name: sum(len(pattern.findall(sample)) for pattern in patterns)
+                  for name, patterns in cls._sniffers.items()}
+        best = max(scores, key=scores.get, default=None)
+        if best is None or scores[best] == 0 or list(scores.values()).count(scores[best]) > 1:
+            return cls.DEFAULT
+        return best
+
+    @classmethod
+    def detect(cls, path=None, text=None):
+        """Elige el lenguaje por extensión y, si no alcanza, por contenido"""
+        language = cls.for_path(path) if path else None
+        if language is None and text:
+            language = cls.sniff(text)
+        return language or cls.DEFAULT
+
+
+for _grammar in BUILTIN_GRAMMARS:
+    LanguageRegistry.register(_grammar)
@@ -0,0 +1,269 @@
+import re
+from array import array
+from functools import partial, reduce
+from itertools import accumulate, compress, count, islice, repeat
+from operator import contains, methodcaller, or_
+
+from core.grammars import C
+
+
+class CommentLexer:
+    """Lexer de una sola pasada que elimina comentarios respetando cadenas y caracteres.
+
+    La gramática (C por defecto) se compila una sola vez en una expresión
+    regular combinada. Cada rama empieza con el literal de su apertura para
+    que el motor de `re` salte en C hasta el siguiente carácter que puede
+    abrir un token; las aperturas que comparten ese carácter se agrupan bajo
+    él, las más largas primero. `re.split` deja las partes como
+    [código, grupo 1, ..., grupo k, código, ...] con un grupo por comentario
+    de bloque o cadena.
+    """
+
+    CHUNK_LINES = 65536
+
+    def __init__(self, grammar=C):
+        self.grammar = grammar
+        self._compile(grammar)
+
+    def _compile(self, grammar):
+        tokens = [(opener, "line", None) for opener in grammar.line_comments]
+        tokens += [(opener, "block", closer) for opener, closer in grammar.block_comments]
+        tokens += [(opener, "mstring", closer) for opener, closer in grammar.multiline_strings]
+        tokens += [(quote, "string", quote) for quote in grammar.strings]
+
+        branches = {}
+        for opener, kind, closer in sorted(tokens, key=lambda token: -len(token[0])):
+            rest = re.escape(opener[1:])
+            if kind == "line":
+                body = rest + r"[^\n]*"
+            elif kind == "string":
+                quote = re.escape(closer)
+                body = rf"({rest}[^{quote}\\\n]*(?:\\[^\n][^{quote}\\\n]*)*{quote}?)"
+            else:
+                body = rf"({rest}.*?(?:{re.escape(closer)}|\Z))"
+            branches.setdefault(opener[0], []).append((body, kind, opener, closer))
+
+        pattern = []
+        groups = []
+        for first, alternatives in branches.items():
+            head = re.escape(first)
+            if grammar.word_comments and any(kind == "line" for _, kind, _, _ in alternatives):
+                # El literal va primero; la aserción posterior exige inicio de palabra
+                head += rf"(?<![^\s]{re.escape(first)})"
+            bodies = [body for body, _, _, _ in alternatives]
+            pattern.append(head + (bodies[0] if len(bodies) == 1 else "(?:" + "|".join(bodies) + ")"))
+            groups += [(kind, opener, closer) for _, kind, opener, closer in alternatives if kind != "line"]
+
+        self._token_re = re.compile("|".join(pattern) if pattern else r"(?!)", re.DOTALL)
+        self._groups = groups
+        self._stride = len(groups) + 1
+
+        # Estados posibles (el cierre pendiente) y grupos que pueden cruzar líneas
+        self._state_kinds = {}
+        self._multiline_groups = []
+        for index, (kind, opener, closer) in enumerate(groups, start=1):
+            if kind in ("block", "mstring"):
+                if self._state_kinds.get(closer, kind) != kind:
+                    raise ValueError(f"{grammar.name}: '{closer}' closes both a comment and a string")
+                self._state_kinds[closer] = kind
+                self._multiline_groups.append((index, kind, len(opener) - 1 + len(closer), closer))
+
+        # Solo una línea con alguno de estos caracteres puede cambiar el estado
+        triggers = {opener[0] for opener, kind, _ in tokens if kind != "string"}
+        triggers |= {closer[-1] for closer in self._state_kinds}
+        self._triggers = "".join(sorted(triggers))
+
+    def _split(self, text):
+        """Parte el texto en [código, grupo 1, ..., grupo k, código, ...]"""
+        return self._token_re.split(text)
+
+    def _end_state(self, parts):
+        """Retorna el estado del lexer al final de un texto ya partido"""
+        if len(parts) > 1:
+            last = len(parts) - self._stride - 1
+            for index, _, minimum, closer in self._multiline_groups:
+                value = parts[last + index]
+                if value is not None:
+                    if len(value) < minimum or not value.endswith(closer):
+                        return closer
+                    return None
+        return None
+
+    def _join(self, parts):
+        """Reconstruye el texto sin comentarios conservando los saltos de línea"""
+        stride = self._stride
+        for index, (kind, opener, _) in enumerate(self._groups, start=1):
+            if kind == "block":
+                parts[index::stride] = [value and "\n" * value.count("\n") for value in parts[index::stride]]
+            else:
+                first = opener[0]
+                parts[index::stride] = [None if value is None else first + value for value in parts[index::stride]]
+        return "".join(filter(None, parts))
+
+    def _marked_lines(self, lines, start):
+        """Retorna los índices, desde `start`, de las líneas que contienen un carácter disparador"""
+        if not self._triggers:
+            return []
+        # Un `in` por carácter, combinados con `or_`, es más rápido que una clase de regex
+        flags = [map(contains, islice(lines, start, None), repeat(trigger)) for trigger in self._triggers]
+        flags = reduce(partial(map, or_), flags)
+        return list(compress(count(start), flags))
+
+    def _skip_open(self, text, state):
+        """Separa el prefijo de un texto que empieza con un token abierto.
+
+        Retorna (prefijo conservado, resto a lexear, saltos de línea del
+        prefijo), o None si el token no se cierra dentro del texto.
+        """
+        end = text.find(state)
+        if end == -1:
+            return None
+        end += len(state)
+        if self._state_kinds[state] == "block":
+            return "", text[end:], text.count("\n", 0, end)
+        return text[:end], text[end:], 0
+
+    def strip(self, text, state=None):
+        """Elimina los comentarios de un texto conservando todos los saltos de línea.
+
+        `state` es el delimitador de cierre pendiente si el texto empieza dentro de
+        un comentario de bloque o de una cadena multilínea (None si empieza en
+        código). Retorna el texto sin comentarios y el estado al final del texto.
+        """
+        prefix = ""
+        if state is not None:
+            skipped = self._skip_open(text, state)
+            if skipped is None:
+                if self._state_kinds[state] == "block":
+                    return "\n" * text.count("\n"), state
+                return text, state
+            prefix, text, newlines = skipped
+            prefix += "\n" * newlines
+
+        parts = self._split(text)
+        state = self._end_state(parts)
+        return prefix + self._join(parts), state
+
+    @staticmethod
+    def add_span(spans, start, stop, state):
+        """Agrega un rango de líneas que empiezan dentro de un comentario de bloque o cadena multilínea"""
+        if start >= stop:
+            return
+        if spans and spans[-1][1] == start and spans[-1][2] == state:
+            spans[-1] = (spans[-1][0], stop, state)
+        else:
+            spans.append((start, stop, state))
+
+    def _blank_block_gaps(self, lines, marked, parts, spans=None, offset=0):
+        """Vacía las líneas sin disparadores que quedan dentro de un comentario de bloque.
+
+        Las líneas intermedias de una cadena multilínea se conservan, pero su
+        rango también se registra en `spans`.
+        """
+        stride = self._stride
+        columns = [parts[index::stride] for index, _, _, _ in self._multiline_groups]
+        multiline = []
+        for column, group in zip(columns, self._multiline_groups):
+            found = [k for k, value in enumerate(column) if value and "\n" in value]
+            multiline += zip(found, repeat(group))
+
+        last = (len(parts) - 1) // stride - 1
+        unterminated = self._end_state(parts)
+        if unterminated is not None and not any(k == last for k, _ in multiline):
+            for column, group in zip(columns, self._multiline_groups):
+                if column[last] is not None:
+                    multiline.append((last, group))
+        if not multiline:
+            return
+        multiline.sort(key=lambda item: item[0])
+
+        # Saltos de línea antes de cada token: los de código más los de los grupos multilínea
+        code_newlines = list(accumulate(map(str.count, parts[0::stride], repeat("\n"))))
+        if len(columns) == 1:
+            counts = (value.count("\n") if value else 0 for value in columns[0])
+        else:
+            counts = (sum(value.count("\n") for value in values if value) for values in zip(*columns))
+        group_newlines = list(accumulate(counts, initial=0))
+        for k, (index, kind, _, closer) in multiline:
+            first = code_newlines[k] + group_newlines[k]
+            start = marked[first] + 1
+            if unterminated is not None and k == last:
+                stop = len(lines)
+                inside = stop
+            else:
+                stop = marked[first + parts[k * stride + index].count("\n")]
+                inside = stop + 1
+            if kind == "block":
+                lines[start:stop] = [""] * (stop - start)
+            if spans is not None:
+                self.add_span(spans, offset + start, offset + inside, closer)
+
+    def strip_lines(self, lines, state=None, spans=None, offset=0):
+        """Elimina en su lugar los comentarios de una lista de líneas.
+
+        `state` es el estado del lexer al inicio de la primera línea. Retorna el
+        estado al final de la última línea. Si se pasa `spans`, agrega los rangos
+        (inicio, fin, estado) de líneas que empiezan dentro de un comentario de
+        bloque o cadena multilínea, desplazados por `offset`.
+        """
+        start = 0
+        prefix = ""
+        if state is not None:
+            # Avanzar hasta la línea que cierra el token pendiente
+            comment = self._state_kinds[state] == "block"
+            while start < len(lines) and state not in lines[start]:
+                if comment:
+                    lines[start] = ""
+                start += 1
+            if spans is not None:
+                self.add_span(spans, offset, offset + min(start + 1, len(lines)), state)
+            if start == len(lines):
+                return state
+            prefix, lines[start], _ = self._skip_open(lines[start], state)
+
+        # Solo las líneas con un carácter disparador pueden abrir o cerrar un
+        # comentario, así que esas se lexean juntas en un único buffer y el
+        # resto se copia tal cual.
+        state = None
+        marked = self._marked_lines(lines, start)
+        if marked:
+            parts = self._split("\n".join(map(lines.__getitem__, marked)))
+            state = self._end_state(parts)
+            self._blank_block_gaps(lines, marked, parts, spans, offset)
+            for idx, line in zip(marked, self._join(parts).split("\n")):
+                lines[idx] = line
+        if prefix:
+            lines[start] = prefix + lines[start]
+        return state
+
+    def clean(self, code):
+        """Limpia el código y construye el mapeo de líneas limpias a originales (array 'I')"""
+        lines = code.split("\n")
+        self.strip_lines(lines)
+        lines = list(map(str.strip, lines))
+        return "\n".join(filter(None, lines)), array("I", compress(count(), lines))
+
+    def iter_chunks(self, lines, chunk_lines=None, spans=None):
+        """Limpia un iterable de líneas por bloques, manteniendo el estado entre bloques.
+
+        Produce tuplas (líneas limpias, índices originales, líneas leídas) sin
+        cargar nunca más de `chunk_lines` líneas en memoria. Si se pasa `spans`,
+        acumula ahí los rangos de líneas dentro de comentarios de bloque.
+        """
+        chunk_lines = chunk_lines or self.CHUNK_LINES
+        iterator = iter(lines)
+        offset = 0
+        state = None
+        while True:
+            chunk = list(map(methodcaller("rstrip", "\r\n"), islice(iterator, chunk_lines)))
+            if not chunk:
+                return
+            state = self.strip_lines(chunk, state, spans, offset)
+            chunk = list(map(str.strip, chunk))
+            yield list(filter(None, chunk)), list(compress(count(offset), chunk)), len(chunk)
+            offset += len(chunk)
+
+    def iter_clean(self, lines, chunk_lines=None):
+        """Produce pares (línea limpia, índice original) a partir de un iterable de líneas"""
+        for cleaned, indices, _ in self.iter_chunks(lines, chunk_lines):
+            yield from zip(cleaned, indices)
@@ -0,0 +1,131 @@
+from bisect import bisect_left
+from collections import Counter
+
+
+class LineDiff:
+    """Diff de líneas: patience para anclar y Myers para los huecos.
+
+    Primero se recortan el prefijo y el sufijo comunes. En lo que queda,
+    las líneas que aparecen una sola vez en cada lado y en el mismo orden
+    (la subsecuencia creciente más larga) sirven de anclas, y cada hueco
+    entre anclas se resuelve igual. Los huecos sin anclas se comparan con
+    Myers, que se abandona si la distancia de edición supera
+    `MAX_EDIT_DISTANCE` (el hueco se toma entonces como reemplazado).
+    """
+
+    MAX_EDIT_DISTANCE = 1000
+
+    @classmethod
+    def matching_blocks(cls, old, new):
+        """Retorna los bloques (inicio en old, inicio en new, largo) de líneas iguales, en orden"""
+        pairs = []
+        cls._patience(old, new, 0, len(old), 0, len(new), pairs)
+        blocks = []
+        for a, b in pairs:
+            if blocks and blocks[-1][0] + blocks[-1][2] == a and blocks[-1][1] + blocks[-1][2] == b:
+                blocks[-1][2] += 1
+            else:
+                blocks.append([a, b, 1])
+        return [tuple(block) for block in blocks]
+
+    @classmethod
+    def _patience(cls, old, new, a0, a1, b0, b1, pairs):
+        """Agrega a `pairs` las líneas emparejadas de old[a0:a1] y new[b0:b1]"""
+        while a0 < a1 and b0 < b1 and old[a0] == new[b0]:
+            pairs.append((a0, b0))
+            a0 += 1
+            b0 += 1
+        suffix = []
+        while a0 < a1 and b0 < b1 and old[a1 - 1] == new[b1 - 1]:
+            a1 -= 1
+            b1 -= 1
+            suffix.append((a1, b1))
+
+        if a0 < a1 and b0 < b1:
+            anchors = cls._anchors(old, new, a0, a1, b0, b1)
+            if anchors:
+                for a, b in anchors:
+                    cls._patience(old, new, a0, a, b0, b, pairs)
+                    pairs.append((a, b))
+                    a0, b0 = a + 1, b + 1
+                cls._patience(old, new, a0, a1, b0, b1, pairs)
+            else:
+                pairs.extend(cls._myers(old, new, a0, a1, b0, b1))
+        pairs.extend(reversed(suffix))
+
+    @staticmethod
+    def _anchors(old, new, a0, a1, b0, b1):
+        """Retorna las líneas únicas en ambos lados que forman la subsecuencia creciente más larga"""
+        old_counts = Counter(old[a0:a1])
+        new_counts = Counter(new[b0:b1])
+        new_index = {line: b for b, line in enumerate(new[b0:b1], b0)
+                     if new_counts[line] == 1 and old_counts[line] == 1}
+        candidates = [(a, new_index[line]) for a, line in enumerate(old[a0:a1], a0) if line in new_index]
+        if not candidates:
+            return []
+
+        # Patience sorting: cada línea se apila sobre la primera pila con tope mayor
+        tops = []
+        top_positions = []
+        previous = [None] * len(candidates)
+        for position, (_, b) in enumerate(candidates):
+            pile = bisect_left(tops, b)
+            previous[position] = top_positions[pile - 1] if pile else None
+            if pile == len(tops):
+                tops.append(b)
+                top_positions.append(position)
+            else:
+                tops[pile] = b
+                top_positions[pile] = position
+
+        anchors = []
+        position = top_positions[-1]
+        while position is not None:
+            anchors.append(candidates[position])
+            position = previous[position]
+        anchors.reverse()
+        return anchors
+
+    @classmethod
+    def _myers(cls, old, new, a0, a1, b0, b1):
+        """Retorna las líneas emparejadas por un diff de Myers de los dos rangos, o [] si difieren demasiado"""
+        n, m = a1 - a0, b1 - b0
+        frontier = {1: 0}
+        trace = []
+        for d in range(min(n + m, cls.MAX_EDIT_DISTANCE) + 1):
+            trace.append(dict(frontier))
+            for k in range(-d, d + 1, 2):
+                if k == -d or (k != d and frontier[k - 1] < frontier[k + 1]):
+                    x = frontier[k + 1]
+                else:
+                    x = frontier[k - 1] + 1
+                y = x - k
+                while x < n and y < m and old[a0 + x] == new[b0 + y]:
+                    x += 1
+                    y += 1
+                frontier[k] = x
+                if x >= n and y >= m:
+                    return cls._backtrack(trace, n, m, a0, b0)
+        return []
+
+    @staticmethod
+    def _backtrack(trace, x, y, a0, b0):
+        """Recorre el camino de Myers hacia atrás y retorna sus diagonales en orden"""
+        pairs = []
+        for d in range(len(trace) - 1, -1, -1):
+            frontier = trace[d]
+            k = x - y
+            if k == -d or (k != d and frontier[k - 1] < frontier[k + 1]):
+                previous_k = k + 1
+            else:
+                previous_k = k - 1
+            previous_x = frontier[previous_k]
+            previous_y = previous_x - previous_k
+            while x > previous_x and y > previous_y:
+                x -= 1
+                y -= 1
+                pairs.append((a0 + x, b0 + y))
+            if d:
+                x, y = previous_x, previous_y
+        pairs.reverse()
+        return pairs
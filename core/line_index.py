@@ -0,0 +1,85 @@
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, islice, repeat
+from operator import add
+
+
+class LineIndex:
+    """Índice de los inicios de línea de un texto, construido una sola vez.
+
+    Acepta un `str` o un buffer de bytes (bytes, mmap, memoryview). Los
+    saltos de línea se buscan por ventanas de `WINDOW` caracteres con `split`
+    y los largos se acumulan desde C, sin un bucle de Python por línea. Da
+    línea → posición en O(1), posición → línea en O(log n) y la cantidad de
+    líneas, y se puede indexar como una lista de líneas sin copiar el texto.
+    """
+
+    WINDOW = 1 << 22
+
+    def __init__(self, text):
+        self.text = text
+        self._size = len(text)
+        self._newline = "\n" if isinstance(text, str) else b"\n"
+        # Con un inicio ficticio al final, el fin de la línea i siempre es _starts[i + 1] - 1
+        self._starts = self._scan(text, self._newline, self._size)
+        self._starts.append(self._size + 1)
+        self._view = isinstance(text, memoryview)
+
+    @classmethod
+    def _scan(cls, text, newline, size):
+        """Retorna un array con la posición de inicio de cada línea"""
+        starts = array("Q", [0])
+        carry = 0
+        for position in range(0, size, cls.WINDOW):
+            window = cls._bytes(text[position:position + cls.WINDOW])
+            lengths = list(map(len, window.split(newline)))
+            # La última parte sigue en la ventana siguiente
+            tail = lengths.pop()
+            if lengths:
+                lengths[0] += carry
+                starts.extend(islice(accumulate(map(add, lengths, repeat(1)), initial=starts[-1]), 1, None))
+                carry = tail
+            else:
+                carry += tail
+        return starts
+
+    @staticmethod
+    def _bytes(part):
+        return part.tobytes() if isinstance(part, memoryview) else part
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    def __getitem__(self, line):
+        if line < 0:
+            line += len(self)
+        line = self.text[self._starts[line]:self._starts[line + 1] - 1]
+        return line.tobytes() if self._view else line
+
+    def __iter__(self):
+        for chunk in self.iter_chunks(1 << 16):
+            yield from chunk
+
+    def offset(self, line):
+        """Retorna la posición donde empieza una línea"""
+        return self._starts[line]
+
+    def line_at(self, offset):
+        """Retorna la línea que contiene una posición"""
+        return min(bisect_right(self._starts, offset), len(self)) - 1
+
+    def span(self, line):
+        """Retorna (inicio, fin) de una línea, sin su salto de línea"""
+        return self._starts[line], self._starts[line + 1] - 1
+
+    def lines(self, start, stop):
+        """Retorna la lista de líneas [start, stop) cortando solo ese tramo del texto"""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        return self._bytes(self.text[self._starts[start]:self.span(stop - 1)[1]]).split(self._newline)
+
+    def iter_chunks(self, chunk_lines):
+        """Produce las líneas del texto en listas de hasta `chunk_lines`"""
+        for start in range(0, len(self), chunk_lines):
+            yield self.lines(start, start + chunk_lines)
@@ -0,0 +1,161 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+from operator import add
+
+
+class _ShiftedArray:
+    """Array de enteros con desplazamientos de cola pendientes que se suman al leer.
+
+    Desplazar la cola desde una posición solo agrega un tramo (inicio,
+    desplazamiento acumulado); los valores guardados se reescriben recién al
+    acumular `MAX_PENDING` tramos o cuando se pide el array completo.
+    """
+
+    MAX_PENDING = 32
+
+    def __init__(self, values):
+        self.values = values
+        self._starts = []
+        self._offsets = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index] + self._offset_at(index)
+
+    def _offset_at(self, index):
+        k = bisect_right(self._starts, index) - 1
+        return self._offsets[k] if k >= 0 else 0
+
+    def shift_tail(self, start, delta):
+        """Suma `delta` a todos los valores desde `start`"""
+        if not delta or start >= len(self.values):
+            return
+        starts, offsets = self._starts, self._offsets
+        k = bisect_left(starts, start)
+        if k == len(starts) or starts[k] != start:
+            starts.insert(k, start)
+            offsets.insert(k, offsets[k - 1] if k else 0)
+        for j in range(k, len(offsets)):
+            offsets[j] += delta
+        if len(starts) > self.MAX_PENDING:
+            self.settle()
+
+    def replace(self, lo, hi, new_values):
+        """Reemplaza los valores [lo, hi) por `new_values` (valores reales)"""
+        starts, offsets = self._starts, self._offsets
+        offset = self._offset_at(lo)
+        # La cola conserva su desplazamiento aunque se quiten los tramos que empiezan dentro
+        if hi < len(self.values) and hi not in starts and self._offset_at(hi) != offset:
+            k = bisect_left(starts, hi)
+            offsets.insert(k, self._offset_at(hi))
+            starts.insert(k, hi)
+        a, b = bisect_right(starts, lo), bisect_left(starts, hi)
+        del starts[a:b], offsets[a:b]
+
+        stored = array(self.values.typecode, new_values)
+        if offset:
+            stored = array(stored.typecode, map(add, stored, repeat(-offset)))
+        self.values[lo:hi] = stored
+        change = len(stored) - (hi - lo)
+        for j in range(a, len(starts)):
+            starts[j] += change
+
+    def settle(self):
+        """Aplica los desplazamientos pendientes a los valores guardados y los retorna"""
+        values = self.values
+        bounds = self._starts + [len(values)]
+        for start, stop, offset in zip(bounds, bounds[1:], self._offsets):
+            if offset:
+                values[start:stop] = array(values.typecode, map(add, values[start:stop], repeat(offset)))
+        self._starts = []
+        self._offsets = []
+        return values
+
+
+class LineMap:
+    """Mapeo bidireccional entre líneas limpias y líneas originales.
+
+    `to_original(i)` es la línea original de la línea limpia i y
+    `to_clean(j)` la línea limpia de la original j, o -1 si la línea fue
+    eliminada. Ambas consultas son O(1) salvo por los desplazamientos
+    pendientes, que se buscan con bisect.
+
+    Cuando una edición cambia la cantidad de líneas, la cola de cada array no
+    se recorre: el desplazamiento queda pendiente en un _ShiftedArray, así que
+    una edición cuesta O(líneas editadas) y no O(archivo).
+    """
+
+    DELETED = -1
+
+    def __init__(self, clean_to_original, line_count):
+        forward = array("i", clean_to_original)
+        # Para cada línea original, la primera línea limpia que viene de ella o de una posterior;
+        # a diferencia de un -1 por línea eliminada, este array es creciente y se desplaza en bloque
+        reverse = array("i")
+        previous = -1
+        for clean, original in enumerate(forward):
+            reverse.extend(repeat(clean, original - previous))
+            previous = original
+        reverse.extend(repeat(len(forward), line_count - previous - 1))
+        self._forward = _ShiftedArray(forward)
+        self._reverse = _ShiftedArray(reverse)
+
+    def __len__(self):
+        return len(self._forward)
+
+    @property
+    def line_count(self):
+        return len(self._reverse)
+
+    @property
+    def clean_to_original(self):
+        """Array completo línea limpia → original (aplica los desplazamientos pendientes)"""
+        return self._forward.settle()
+
+    @property
+    def original_to_clean(self):
+        """Array línea original → limpia, con -1 en las líneas eliminadas"""
+        return array("i", map(self.to_clean, range(self.line_count)))
+
+    def to_clean(self, original):
+        """Retorna la línea limpia de una línea original, o -1 si fue eliminada"""
+        if 0 <= original < len(self._reverse):
+            clean = self._reverse[original]
+            if self.to_original(clean) == original:
+                return clean
+        return self.DELETED
+
+    def to_original(self, clean):
+        """Retorna la línea original de una línea limpia, o -1 si no existe"""
+        if 0 <= clean < len(self._forward):
+            return self._forward[clean]
+        return self.DELETED
+
+    def first_clean_from(self, original):
+        """Retorna la primera línea limpia cuya línea original es >= `original`"""
+        if original <= 0:
+            return 0
+        if original >= len(self._reverse):
+            return len(self._forward)
+        return self._reverse[original]
+
+    def clean_range(self, start, end):
+        """Retorna el rango [inicio, fin) de líneas limpias cuyas originales están en [start, end]"""
+        return self.first_clean_from(start), self.first_clean_from(end + 1)
+
+    def replace(self, first, old_end, new_end, lo, hi, new_indices):
+        """Sustituye las líneas originales [first, old_end) por [first, new_end).
+
+        Las líneas limpias [lo, hi) pasan a ser las de `new_indices` (índices
+        originales ya en la numeración nueva). Las colas no se recorren: solo
+        se agrega su desplazamiento pendiente.
+        """
+        self._forward.shift_tail(hi, new_end - old_end)
+        self._forward.replace(lo, hi, new_indices)
+
+        self._reverse.shift_tail(old_end, len(new_indices) - (hi - lo))
+        self._reverse.replace(first, old_end, [lo + bisect_left(new_indices, original)
+                                               for original in range(first, new_end)])
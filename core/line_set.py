@@ -0,0 +1,170 @@
+import re
+
+# Cantidad de bits en 1 de cada valor de byte
+_POPCOUNT = bytes(bin(value).count("1") for value in range(256))
+_NONZERO = re.compile(rb"[^\x00]+")
+
+
+class LineSet:
+    """Conjunto de números de línea guardado como mapa de bits.
+
+    Ocupa un bit por línea hasta la mayor línea agregada. La pertenencia es
+    O(1) y los rangos se marcan o desmarcan byte a byte desde C. Mantiene la
+    interfaz de `set` que usa la aplicación (in, len, add, remove, discard,
+    update, clear e iteración ordenada) y agrega `runs()` para recorrer los
+    rangos consecutivos.
+    """
+
+    WINDOW_BYTES = 64
+
+    def __init__(self, lines=()):
+        self._bits = bytearray()
+        self._count = 0
+        self.update(lines)
+
+    @staticmethod
+    def _popcount(data):
+        counts = data.translate(_POPCOUNT)
+        return sum(bits * counts.count(bits) for bits in range(1, 9))
+
+    def __contains__(self, line):
+        byte = line >> 3
+        return 0 <= line and byte < len(self._bits) and bool(self._bits[byte] >> (line & 7) & 1)
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        for start, end in self.runs():
+            yield from range(start, end + 1)
+
+    def __repr__(self):
+        return f"LineSet({list(self.runs())})"
+
+    def add(self, line):
+        if line < 0:
+            raise ValueError(f"line numbers must be non-negative: {line}")
+        byte = line >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        mask = 1 << (line & 7)
+        if not self._bits[byte] & mask:
+            self._bits[byte] |= mask
+            self._count += 1
+
+    def discard(self, line):
+        if line in self:
+            self._bits[line >> 3] &= ~(1 << (line & 7)) & 0xFF
+            self._count -= 1
+
+    def remove(self, line):
+        if line not in self:
+            raise KeyError(line)
+        self.discard(line)
+
+    def clear(self):
+        self._bits.clear()
+        self._count = 0
+
+    def update(self, lines):
+        """Agrega varias líneas; un range de paso 1 se marca por bytes"""
+        if isinstance(lines, range) and lines.step == 1:
+            self.add_range(lines.start, lines.stop)
+        elif isinstance(lines, LineSet):
+            for start, end in lines.runs():
+                self.add_range(start, end + 1)
+        else:
+            for line in lines:
+                self.add(line)
+
+    def _set_range(self, start, stop, value):
+        """Marca o desmarca las líneas [start, stop) y actualiza el conteo"""
+        first_byte, last_byte = start >> 3, (stop - 1) >> 3
+        before = self._popcount(self._bits[first_byte:last_byte + 1])
+
+        head = (0xFF << (start & 7)) & 0xFF
+        tail = 0xFF >> (7 - ((stop - 1) & 7))
+        if first_byte == last_byte:
+            masks = ((first_byte, head & tail),)
+        else:
+            fill = b"\xff" if value else b"\x00"
+            self._bits[first_byte + 1:last_byte] = fill * (last_byte - first_byte - 1)
+            masks = ((first_byte, head), (last_byte, tail))
+        for byte, mask in masks:
+            if value:
+                self._bits[byte] |= mask
+            else:
+                self._bits[byte] &= ~mask & 0xFF
+
+        self._count += self._popcount(self._bits[first_byte:last_byte + 1]) - before
+
+    def add_range(self, start, stop):
+        """Agrega las líneas [start, stop)"""
+        if start < 0:
+            raise ValueError(f"line numbers must be non-negative: {start}")
+        if stop <= start:
+            return
+        needed = ((stop - 1) >> 3) + 1
+        if needed > len(self._bits):
+            self._bits.extend(bytes(needed - len(self._bits)))
+        self._set_range(start, stop, True)
+
+    def discard_range(self, start, stop):
+        """Quita las líneas [start, stop)"""
+        start = max(start, 0)
+        stop = min(stop, len(self._bits) << 3)
+        if stop > start:
+            self._set_range(start, stop, False)
+
+    def shift(self, start, delta):
+        """Mueve `delta` posiciones todas las líneas desde `start`.
+
+        Con `delta` negativo primero se quitan las líneas [start + delta, start),
+        que quedarían tapadas. El desplazamiento se hace sobre un entero con
+        los bytes de la cola, sin recorrer las líneas una por una.
+        """
+        if not delta:
+            return
+        target = start + delta
+        if target < 0:
+            raise ValueError(f"line numbers must be non-negative: {target}")
+        if delta < 0:
+            self.discard_range(target, start)
+        if start >= len(self._bits) << 3:
+            return
+        base = min(start, target) >> 3
+        value = int.from_bytes(self._bits[base:], "little")
+        offset = start - (base << 3)
+        kept = value & ((1 << offset) - 1)
+        moved = (value >> offset) << (target - (base << 3))
+        value = kept | moved
+        self._bits[base:] = value.to_bytes((value.bit_length() + 7) >> 3, "little")
+
+    def runs(self):
+        """Produce los rangos (inicio, fin) inclusivos de líneas consecutivas, en orden"""
+        pending = None
+        for match in _NONZERO.finditer(self._bits):
+            # Ventanas acotadas para que los desplazamientos de enteros no crezcan
+            for offset in range(match.start(), match.end(), self.WINDOW_BYTES):
+                window = self._bits[offset:min(offset + self.WINDOW_BYTES, match.end())]
+                bits = int.from_bytes(window, "little")
+                position = offset << 3
+                while bits:
+                    skip = (bits & -bits).bit_length() - 1
+                    bits >>= skip
+                    position += skip
+                    length = (bits ^ (bits + 1)).bit_length() - 1
+                    start, end = position, position + length - 1
+                    bits >>= length
+                    position += length
+                    if pending and pending[1] + 1 == start:
+                        pending = (pending[0], end)
+                    else:
+                        if pending:
+                            yield pending
+                        pending = (start, end)
+        if pending:
+            yield pending
@@ -0,0 +1,363 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from core.code_processor import CodeProcessor
+from core.instrumentation import PathStats
+from core.languages import LanguageRegistry
+
+
+def _warm_up():
+    """Compila los lexers de todos los lenguajes al arrancar cada proceso"""
+    for name in LanguageRegistry.names():
+        LanguageRegistry.lexer(name)
+
+
+def _clean_batch(jobs):
+    """Limpia una lista de (código, lenguaje, ruta); retorna (texto, mapeo, lenguaje) por trabajo"""
+    results = []
+    for code, language, path in jobs:
+        language = language or LanguageRegistry.detect(path, code)
+        cleaned, line_mapping = CodeProcessor.clean_code(code, language)
+        results.append((cleaned, line_mapping, language))
+    return results
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CleanServer:
+    """Servicio local de limpieza sobre HTTP, por TCP en localhost o por socket Unix.
+
+    Los procesos del pool arrancan una sola vez con todos los lexers ya
+    compilados, así que cada pedido evita el arranque del intérprete. Los
+    archivos pedidos se encolan y un bucle los agrupa en lotes de hasta
+    `batch_files` (esperando como mucho `batch_window` segundos) antes de
+    mandarlos al pool, para que miles de archivos chicos no paguen un viaje
+    entre procesos cada uno. Con más de `max_pending` archivos en espera o en
+    proceso se responde 503 en vez de acumular memoria, y un pedido que tarda
+    más de `timeout` segundos responde 504.
+
+    Rutas: POST /clean ({"code", "language"?, "path"?}), POST /clean/batch
+    ({"files": [...]}) y GET /stats.
+    """
+
+    MAX_BODY_BYTES = 64 << 20
+    HEADER_TIMEOUT = 10.0
+    STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                   408: "Request Timeout", 413: "Payload Too Large", 500: "Internal Server Error",
+                   503: "Service Unavailable", 504: "Gateway Timeout"}
+
+    def __init__(self, workers=None, max_pending=10000, timeout=30.0, batch_window=0.002, batch_files=256,
+                 batch_bytes=1 << 20):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.batch_files = batch_files
+        self.batch_bytes = batch_bytes
+        self._executor = None
+        self._queue = None
+        self._servers = []
+        self._tasks = set()
+        self._connections = {}
+        self._pending = 0
+        self._started = time.monotonic()
+        self._latency = PathStats(2048)
+        self._counters = dict.fromkeys(
+            ("requests", "files", "bytes", "batches", "rejected", "timeouts", "errors"), 0)
+
+    async def start(self, host="127.0.0.1", port=None, unix_path=None):
+        """Arranca el pool y los servidores pedidos"""
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        # Con fork los procesos se crean en el primer envío: se fuerza antes de escuchar
+        # para que no hereden los sockets de los clientes y sus cierres lleguen al otro lado
+        await asyncio.get_running_loop().run_in_executor(self._executor, os.getpid)
+        self._queue = asyncio.Queue()
+        self._tasks.add(asyncio.create_task(self._batch_loop()))
+        if port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_connection, host, port))
+        if unix_path is not None:
+            self._servers.append(await asyncio.start_unix_server(self._handle_connection, unix_path))
+
+    def addresses(self):
+        """Retorna las direcciones en las que escucha el servicio"""
+        return [socket.getsockname() for server in self._servers for socket in server.sockets]
+
+    async def serve_forever(self):
+        await asyncio.gather(*(server.serve_forever() for server in self._servers))
+
+    async def close(self):
+        """Deja de aceptar conexiones, cierra las abiertas y apaga el pool"""
+        for server in self._servers:
+            server.close()
+        for writer in self._connections:
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    # Limpieza
+
+    async def clean(self, files):
+        """Limpia una lista de (código, lenguaje, ruta) y retorna sus resultados en orden"""
+        if self._pending + len(files) > self.max_pending:
+            self._counters["rejected"] += 1
+            raise HTTPError(503, "too many pending files, retry later")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for job in files:
+            future = loop.create_future()
+            futures.append(future)
+            self._queue.put_nowait((job, future))
+        self._pending += len(files)
+        try:
+            return await asyncio.wait_for(asyncio.gather(*futures), self.timeout)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise HTTPError(504, f"cleaning took longer than {self.timeout:g}s") from None
+
+    async def _batch_loop(self):
+        """Junta los archivos encolados en lotes y los manda al pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0][0])
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_files and size < self.batch_bytes:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0][0])
+            # Los pedidos que ya vencieron no se limpian; el resto sigue pendiente hasta que termine su lote
+            live = [(job, future) for job, future in batch if not future.done()]
+            self._pending -= len(batch) - len(live)
+            batch = live
+            if batch:
+                self._counters["batches"] += 1
+                task = asyncio.create_task(self._run_batch(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, _clean_batch, [job for job, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        finally:
+            self._pending -= len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        """Retorna los contadores del servicio y la latencia de los pedidos"""
+        stats = dict(self._counters)
+        stats.update(
+            uptime_s=time.monotonic() - self._started,
+            workers=self.workers,
+            pending=self._pending,
+            queued=self._queue.qsize() if self._queue is not None else 0,
+            latency=self._latency.summary(),
+        )
+        return stats
+
+    # HTTP
+
+    @staticmethod
+    def _parse_file(item):
+        if not isinstance(item, dict) or not isinstance(item.get("code"), str):
+            raise HTTPError(400, 'each file needs a "code" string')
+        language = item.get("language")
+        if language is not None and language not in LanguageRegistry.names():
+            raise HTTPError(400, f"unknown language: {language}")
+        return item["code"], language, item.get("path")
+
+    @staticmethod
+    def _result(result, item):
+        cleaned, line_mapping, language = result
+        response = {"cleaned": cleaned, "line_mapping": line_mapping.tolist(), "language": language}
+        if "id" in item:
+            response["id"] = item["id"]
+        return response
+
+    async def _route(self, method, path, body):
+        """Atiende un pedido y retorna el objeto JSON de la respuesta"""
+        if path == "/stats":
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            return self.stats()
+        if path not in ("/clean", "/clean/batch"):
+            raise HTTPError(404, f"no route for {path}")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON") from None
+        if path == "/clean":
+            results = await self.clean([self._parse_file(request)])
+            return self._result(results[0], request)
+
+        items = request.get("files") if isinstance(request, dict) else None
+        if not isinstance(items, list):
+            raise HTTPError(400, 'expected {"files": [...]}')
+        results = await self.clean([self._parse_file(item) for item in items])
+        return {"results": [self._result(result, item) for result, item in zip(results, items)]}
+
+    async def _read_request(self, reader):
+        """Lee un pedido HTTP/1.1; retorna (método, ruta, cuerpo, keep-alive) o None si se cerró"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.HEADER_TIMEOUT)
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "headers too large") from None
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "timed out reading the request") from None
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(400, "malformed request line") from None
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length") from None
+        if length > self.MAX_BODY_BYTES:
+            raise HTTPError(413, f"body larger than {self.MAX_BODY_BYTES} bytes")
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "timed out reading the body") from None
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, urlsplit(target).path, body, keep_alive
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8", "surrogatepass")
+        head = (f"HTTP/1.1 {status} {self.STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+    async def _respond(self, method, path, body):
+        """Retorna (estado, respuesta) de un pedido ya leído y actualiza los contadores"""
+        self._counters["requests"] += 1
+        start = time.perf_counter()
+        try:
+            payload = await self._route(method, path, body)
+        except HTTPError as error:
+            return error.status, {"error": str(error)}
+        except Exception as error:
+            self._counters["errors"] += 1
+            return 500, {"error": f"{type(error).__name__}: {error}"}
+        if path != "/stats":
+            self._latency.add(time.perf_counter() - start)
+            self._counters["files"] += len(payload.get("results", [payload]))
+            self._counters["bytes"] += len(body)
+        return 200, payload
+
+    async def _handle_connection(self, reader, writer):
+        """Atiende los pedidos de una conexión, uno tras otro mientras siga abierta"""
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as error:
+                    # Un pedido a medio leer deja la conexión en un estado desconocido
+                    self._write_response(writer, error.status, {"error": str(error)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload = await self._respond(method, path, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.server",
+        description="Serve comment cleaning over local HTTP with warm worker processes.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+    parser.add_argument("-p", "--port", type=int, help="TCP port (default: 8765 unless --socket is given)")
+    parser.add_argument("--socket", help="Unix socket path to listen on")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--max-pending", type=int, default=10000,
+                        help="files queued or being cleaned before answering 503 (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="seconds before a request answers 504 (default: %(default)s)")
+    return parser
+
+
+async def _serve(args):
+    server = CleanServer(args.workers, args.max_pending, args.timeout)
+    port = args.port if args.port is not None or args.socket else 8765
+    await server.start(args.host, port, args.socket)
+    for address in server.addresses():
+        print(f"Listening on {address}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        print("error: --workers must be at least 1", file=sys.stderr)
+        return 2
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
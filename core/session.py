@@ -0,0 +1,207 @@
+import codecs
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import chain, islice
+
+from core.line_set import LineSet
+from core.source_file import NEW_FILE_MODE
+
+READ_CHUNK_BYTES = 1 << 22
+WRITE_CHUNK_LINES = 65536
+
+
+class SessionFile:
+    """Sesión de trabajo guardada en un archivo binario compacto.
+
+    Tras una firma, el archivo es una serie de secciones en orden fijo
+    (`SECTIONS`), cada una precedida por su largo en un entero de 8 bytes:
+    textos en UTF-8, el mapeo de líneas como `array('I')` y los resaltados
+    como pares (inicio, largo) de cada rango consecutivo. Los números se
+    guardan en little-endian.
+
+    Al abrirlo solo se recorren los largos de las secciones sobre un mmap;
+    cada sección se decodifica recién cuando se pide, y el mapeo y los
+    resaltados se copian directamente desde el mmap sin volver a limpiar.
+    """
+
+    MAGIC = b"CCSESS\x00\x01"
+    SECTIONS = (
+        "language",
+        "source_path",
+        "original",
+        "clean",
+        "line_map",
+        "span_bounds",
+        "span_states",
+        "highlighted",
+        "highlighted_output",
+    )
+    SUFFIX = ".ccsession"
+
+    _LENGTH = struct.Struct("<Q")
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(self.MAGIC):
+                raise ValueError(f"not a session file: {path}")
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._data[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError(f"not a session file: {path}")
+            self._sections = self._index(size)
+        except (ValueError, struct.error):
+            self._data.close()
+            raise ValueError(f"damaged session file: {path}") from None
+
+    def _index(self, size):
+        """Retorna {sección: (inicio, fin)} leyendo solo los largos"""
+        sections = {}
+        position = len(self.MAGIC)
+        for name in self.SECTIONS:
+            (length,) = self._LENGTH.unpack_from(self._data, position)
+            position += self._LENGTH.size
+            if position + length > size:
+                raise ValueError(name)
+            sections[name] = (position, position + length)
+            position += length
+        return sections
+
+    def close(self):
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # Lectura
+
+    def text(self, name):
+        """Decodifica una sección de texto completa"""
+        start, stop = self._sections[name]
+        return str(self._data[start:stop], "utf-8", "surrogatepass")
+
+    def iter_text(self, name, chunk_bytes=READ_CHUNK_BYTES):
+        """Produce el texto de una sección por bloques, sin decodificarla entera"""
+        start, stop = self._sections[name]
+        decoder = codecs.getincrementaldecoder("utf-8")("surrogatepass")
+        for position in range(start, stop, chunk_bytes):
+            end = min(position + chunk_bytes, stop)
+            text = decoder.decode(self._data[position:end], end == stop)
+            if text:
+                yield text
+
+    def array(self, name, typecode="I"):
+        """Copia una sección numérica del mmap a un array"""
+        start, stop = self._sections[name]
+        values = array(typecode)
+        with memoryview(self._data) as view:
+            values.frombytes(view[start:stop])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    @property
+    def language(self):
+        """Lenguaje de la limpieza guardada, o None si la sesión no tiene una"""
+        return self.text("language") or None
+
+    @property
+    def source_path(self):
+        return self.text("source_path") or None
+
+    def clean_lines(self):
+        start, stop = self._sections["clean"]
+        return self.text("clean").split("\n") if stop > start else []
+
+    def line_mapping(self):
+        return self.array("line_map")
+
+    def comment_spans(self):
+        """Retorna los rangos (inicio, fin, estado) de comentarios de bloque y cadenas multilínea"""
+        bounds = self.array("span_bounds")
+        if not bounds:
+            return []
+        states = [state or None for state in self.text("span_states").split("\0")]
+        return list(zip(bounds[0::2], bounds[1::2], states))
+
+    def line_set(self, name):
+        """Reconstruye un conjunto de líneas desde sus pares (inicio, largo)"""
+        runs = self.array(name)
+        lines = LineSet()
+        for start, length in zip(runs[0::2], runs[1::2]):
+            lines.add_range(start, start + length)
+        return lines
+
+    # Escritura
+
+    @classmethod
+    def write(cls, path, original, clean_lines, line_mapping, comment_spans,
+              highlighted_lines, highlighted_output_lines, language=None, source_path=None):
+        """Guarda una sesión de forma atómica; `clean_lines` se escribe por bloques"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            os.chmod(tmp_path, NEW_FILE_MODE)
+            with os.fdopen(fd, "wb") as f:
+                f.write(cls.MAGIC)
+                cls._write_bytes(f, (language or "").encode("utf-8"))
+                cls._write_bytes(f, (source_path or "").encode("utf-8", "surrogateescape"))
+                cls._write_bytes(f, original.encode("utf-8", "surrogatepass"))
+                cls._write_lines(f, clean_lines)
+                cls._write_array(f, array("I", line_mapping))
+                cls._write_array(f, array("I", chain.from_iterable((start, stop) for start, stop, _ in comment_spans)))
+                cls._write_bytes(f, "\0".join(state or "" for _, _, state in comment_spans).encode("utf-8"))
+                cls._write_array(f, cls._runs(highlighted_lines))
+                cls._write_array(f, cls._runs(highlighted_output_lines))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _runs(lines):
+        """Codifica un LineSet como pares (inicio, largo) de sus rangos consecutivos"""
+        return array("I", chain.from_iterable((start, end - start + 1) for start, end in lines.runs()))
+
+    @classmethod
+    def _write_bytes(cls, f, data):
+        f.write(cls._LENGTH.pack(len(data)))
+        f.write(data)
+
+    @classmethod
+    def _write_array(cls, f, values):
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+        cls._write_bytes(f, values.tobytes())
+
+    @classmethod
+    def _write_lines(cls, f, lines):
+        """Escribe líneas unidas por "\\n" por bloques y completa el largo al final"""
+        header = f.tell()
+        f.write(cls._LENGTH.pack(0))
+        iterator = iter(lines)
+        written = 0
+        length = 0
+        while True:
+            chunk = list(islice(iterator, WRITE_CHUNK_LINES))
+            if not chunk:
+                break
+            data = ("\n" if written else "") + "\n".join(chunk)
+            length += f.write(data.encode("utf-8", "surrogatepass"))
+            written += len(chunk)
+        end = f.tell()
+        f.seek(header)
+        f.write(cls._LENGTH.pack(length))
+        f.seek(end)
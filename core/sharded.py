@@ -0,0 +1,187 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, count
+from multiprocessing import shared_memory
+
+from core.code_processor import CodeProcessor
+from core.languages import LanguageRegistry
+
+
+def _attach(name):
+    """Abre un bloque de memoria compartida creado por el proceso principal"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Antes de Python 3.13 no existe `track`; el bloque lo libera el proceso principal
+        return shared_memory.SharedMemory(name=name)
+
+
+def _clean_shard(job):
+    """Limpia los bytes [start, stop) del buffer compartido a partir de un estado dado.
+
+    Escribe el texto limpio en el buffer de salida desde `start` (nunca es más
+    largo que la entrada) y retorna (bytes escritos, mapeo de líneas, estado
+    al final del fragmento).
+    """
+    input_name, output_name, start, stop, line_offset, state, language, encoding, errors = job
+    source = _attach(input_name)
+    target = _attach(output_name)
+    try:
+        lines = str(source.buf[start:stop], encoding, errors).split("\n")
+        end_state = CodeProcessor.lexer(language).strip_lines(lines, state)
+        lines = list(map(str.strip, lines))
+        mapping = array("I", compress(count(line_offset), lines))
+        data = "\n".join(filter(None, lines)).encode(encoding, errors)
+        target.buf[start:start + len(data)] = data
+        return len(data), mapping, end_state
+    finally:
+        source.close()
+        target.close()
+
+
+class ShardedCleaner:
+    """Limpia un único documento enorme repartiéndolo entre varios procesos.
+
+    El texto se copia una sola vez a memoria compartida y se corta en
+    fragmentos en saltos de línea. Un recorrido previo barato cuenta los
+    saltos de línea de cada fragmento para que cada proceso conozca su número
+    de línea inicial. Cada fragmento se limpia suponiendo que empieza en
+    código; al unir los resultados en orden se comprueba esa suposición con
+    el estado final del fragmento anterior, y solo los fragmentos que
+    empiezan dentro de un comentario de bloque o de una cadena multilínea se
+    vuelven a limpiar con el estado correcto.
+    """
+
+    MIN_SHARD_BYTES = 4 << 20
+    SHARDS_PER_WORKER = 2
+    SCAN_BYTES = 16 << 20
+
+    def __init__(self, workers=None, language=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.language = language
+
+    @classmethod
+    def _count_newlines(cls, buffer, start, stop):
+        """Cuenta los saltos de línea de buffer[start:stop] copiando ventanas acotadas"""
+        return sum(bytes(buffer[position:min(position + cls.SCAN_BYTES, stop)]).count(b"\n")
+                   for position in range(start, stop, cls.SCAN_BYTES))
+
+    @staticmethod
+    def _next_newline(buffer, position, size, window=1 << 16):
+        """Retorna la posición del primer salto de línea desde `position`, o -1"""
+        while position < size:
+            found = bytes(buffer[position:min(position + window, size)]).find(b"\n")
+            if found != -1:
+                return position + found
+            position += window
+        return -1
+
+    def _shards(self, buffer, size):
+        """Corta [0, size) en fragmentos (inicio, fin, línea inicial) separados por saltos de línea"""
+        shards = max(1, min(self.workers * self.SHARDS_PER_WORKER, size // self.MIN_SHARD_BYTES))
+        bounds = [0]
+        for shard in range(1, shards):
+            cut = self._next_newline(buffer, max(bounds[-1], size * shard // shards), size)
+            if cut == -1:
+                break
+            bounds.append(cut + 1)
+        bounds.append(size + 1)
+
+        # Cada fragmento excluye el salto de línea que lo separa del siguiente
+        result = []
+        line = 0
+        for start, stop in zip(bounds, bounds[1:]):
+            result.append((start, stop - 1, line))
+            line += self._count_newlines(buffer, start, stop - 1) + 1
+        return result
+
+    def _run(self, source, target, size, encoding, errors):
+        """Limpia el buffer compartido; retorna (rangos de salida, mapeo, líneas originales)"""
+        shards = self._shards(source.buf, size)
+
+        def job(shard, state):
+            start, stop, line = shard
+            return (source.name, target.name, start, stop, line, state, self.language, encoding, errors)
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as executor:
+            results = list(executor.map(_clean_shard, [job(shard, None) for shard in shards]))
+            # Cada fragmento se limpió como si empezara en código; se corrigen los que no
+            state = None
+            for index, shard in enumerate(shards):
+                if state is not None:
+                    results[index] = executor.submit(_clean_shard, job(shard, state)).result()
+                state = results[index][2]
+
+        pieces = [(start, start + length) for (start, _, _), (length, _, _) in zip(shards, results) if length]
+        mapping = array("I")
+        for _, indices, _ in results:
+            mapping.extend(indices)
+        start, stop, line = shards[-1]
+        return pieces, mapping, line + self._count_newlines(source.buf, start, stop) + 1
+
+    def _resolve_language(self, sample, path=None):
+        """Fija el lenguaje antes de repartir, para que todos los fragmentos usen el mismo"""
+        if self.language is None:
+            self.language = LanguageRegistry.detect(path, sample)
+
+    def clean(self, code):
+        """Limpia un texto completo; retorna (texto limpio, mapeo de líneas) como `clean_code`"""
+        if self.workers == 1 or len(code) < 2 * self.MIN_SHARD_BYTES:
+            return CodeProcessor.clean_code(code, self.language)
+        self._resolve_language(code[:LanguageRegistry.SNIFF_CHARS])
+
+        data = code.encode("utf-8", "surrogatepass")
+        size = len(data)
+        source = shared_memory.SharedMemory(create=True, size=size)
+        target = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            source.buf[:size] = data
+            del data
+            pieces, mapping, _ = self._run(source, target, size, "utf-8", "surrogatepass")
+            text = b"\n".join([target.buf[start:stop] for start, stop in pieces]).decode("utf-8", "surrogatepass")
+            return text, mapping
+        finally:
+            for block in (source, target):
+                block.close()
+                block.unlink()
+
+    def clean_file(self, path, target_path, encoding="utf-8"):
+        """Limpia un archivo en `target_path` sin decodificarlo en el proceso principal.
+
+        `encoding` debe conservar el salto de línea como el byte 0x0A (UTF-8,
+        Latin-1, etc.). Retorna (líneas originales, mapeo de líneas); las líneas
+        se cuentan como al leer el archivo por líneas, igual que `BatchCleaner.clean_file`.
+        """
+        size = os.path.getsize(path)
+        if size == 0:
+            open(target_path, "wb").close()
+            return 0, array("I")
+
+        source = shared_memory.SharedMemory(create=True, size=size)
+        target = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            with open(path, "rb") as f:
+                filled = 0
+                while filled < size:
+                    read = f.readinto(source.buf[filled:size])
+                    if not read:
+                        break
+                    filled += read
+            sample = str(source.buf[:LanguageRegistry.SNIFF_CHARS], encoding, "ignore")
+            self._resolve_language(sample, path)
+
+            pieces, mapping, original_lines = self._run(source, target, filled, encoding, "surrogateescape")
+            # El salto de línea final cierra la última línea, no abre una vacía
+            if filled and source.buf[filled - 1] == 0x0A:
+                original_lines -= 1
+            with open(target_path, "wb") as out:
+                for number, (start, stop) in enumerate(pieces):
+                    if number:
+                        out.write(b"\n")
+                    out.write(target.buf[start:stop])
+            return original_lines, mapping
+        finally:
+            for block in (source, target):
+                block.close()
+                block.unlink()
@@ -0,0 +1,60 @@
+import codecs
+import mmap
+import os
+from itertools import islice
+
+READ_CHUNK_BYTES = 1 << 22
+WRITE_CHUNK_LINES = 65536
+
+
+def _new_file_mode():
+    """Retorna los permisos de un archivo nuevo según la umask, leída una sola vez al importar"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# mkstemp crea los temporales con 0600; se corrigen antes de renombrarlos sobre el destino
+NEW_FILE_MODE = _new_file_mode()
+
+
+class SourceFile:
+    """Lectura y escritura por bloques de archivos de código grandes"""
+
+    @staticmethod
+    def iter_text(path, encoding="utf-8", errors="replace", chunk_bytes=READ_CHUNK_BYTES):
+        """Lee un archivo con mmap y produce su texto decodificado por bloques.
+
+        La decodificación es incremental, así que un carácter multibyte partido
+        entre dos bloques se completa en el siguiente. Un "\\r" final se retiene
+        para no separar un "\\r\\n".
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                pending = ""
+                for start in range(0, size, chunk_bytes):
+                    end = min(start + chunk_bytes, size)
+                    text = pending + decoder.decode(data[start:end], end == size)
+                    pending = ""
+                    if text.endswith("\r") and end < size:
+                        text, pending = text[:-1], "\r"
+                    if text:
+                        yield text
+
+    @staticmethod
+    def write_lines(path, lines, encoding="utf-8", errors="strict", chunk_lines=WRITE_CHUNK_LINES):
+        """Escribe un iterable de líneas separadas por "\\n" sin unirlas en un solo texto"""
+        iterator = iter(lines)
+        written = 0
+        with open(path, "w", encoding=encoding, errors=errors, newline="") as f:
+            while True:
+                chunk = list(islice(iterator, chunk_lines))
+                if not chunk:
+                    break
+                f.write(("\n" if written else "") + "\n".join(chunk))
+                written += len(chunk)
+        return written
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+
+class StartupProfile:
+    """Mide cuánto tarda cada fase del arranque de la aplicación.
+
+    Cada `mark(nombre)` cierra la fase que empezó en la marca anterior (o en
+    `start`). Desactivado, no guarda nada, así que puede quedar siempre en el
+    camino de arranque.
+    """
+
+    ENV_VAR = "CODE_CLEANER_PROFILE_STARTUP"
+    FLAG = "--profile-startup"
+
+    def __init__(self, start=None, enabled=True):
+        self.enabled = enabled
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []
+        self._last = self.start
+
+    @classmethod
+    def from_environment(cls, argv, start=None):
+        """Crea un perfil activo si se pidió con la opción o la variable de entorno"""
+        enabled = cls.FLAG in argv or bool(os.environ.get(cls.ENV_VAR))
+        return cls(start, enabled)
+
+    def mark(self, name):
+        """Termina la fase actual con el nombre dado"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self.start
+
+    def report(self, stream=None):
+        """Escribe una tabla con la duración de cada fase y el acumulado"""
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        width = max((len(name) for name, _ in self.phases), default=5)
+        elapsed = 0.0
+        stream.write(f"{'phase':<{width}}  {'ms':>8}  {'total ms':>9}\n")
+        for name, seconds in self.phases:
+            elapsed += seconds
+            stream.write(f"{name:<{width}}  {seconds * 1000:8.1f}  {elapsed * 1000:9.1f}\n")
+        stream.flush()
@@ -0,0 +1,386 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import glob
+import hashlib
+import os
+import select
+import struct
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.batch import BatchCleaner
+from core.source_file import NEW_FILE_MODE
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+class _Inotify:
+    """Cambios de un conjunto de directorios leídos de inotify (solo Linux)"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                  | IN_DELETE_SELF | IN_MOVE_SELF)
+    STRUCTURE_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    READ_BYTES = 1 << 16
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._poller = select.poll()
+        self._poller.register(self._fd, select.POLLIN)
+        self._watches = {}
+        self._directories = {}
+
+    @classmethod
+    def create(cls):
+        """Retorna un lector de inotify, o None si el sistema no lo ofrece"""
+        try:
+            return cls()
+        except (OSError, AttributeError, TypeError):
+            return None
+
+    def track(self, files, directories):
+        """Vigila los directorios que todavía no tienen una vigilancia"""
+        for directory in directories:
+            if directory in self._directories:
+                continue
+            descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+            if descriptor >= 0:
+                self._watches[descriptor] = directory
+                self._directories[directory] = descriptor
+
+    def changes(self, timeout):
+        """Espera hasta `timeout` segundos y retorna (rutas tocadas, rutas creadas, borradas o movidas).
+
+        Si la cola de eventos se desbordó, retorna (None, None): hay que revisar todo.
+        """
+        if not self._poller.poll(max(0, int(timeout * 1000))):
+            return set(), set()
+        paths = set()
+        structure = set()
+        while True:
+            try:
+                data = os.read(self._fd, self.READ_BYTES)
+            except BlockingIOError:
+                break
+            position = 0
+            while position < len(data):
+                descriptor, mask, _, length = self._EVENT.unpack_from(data, position)
+                position += self._EVENT.size
+                name = data[position:position + length].rstrip(b"\0")
+                position += length
+                if mask & self.IN_Q_OVERFLOW:
+                    return None, None
+                directory = self._watches.get(descriptor)
+                if directory is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    del self._watches[descriptor]
+                    self._directories.pop(directory, None)
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                paths.add(path)
+                if mask & (self.STRUCTURE_MASK | self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    structure.add(path)
+        return paths, structure
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _StatPoller:
+    """Cambios detectados comparando el stat de archivos y directorios cada `interval` segundos"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._files = {}
+        self._directories = {}
+        self._next_poll = time.monotonic()
+
+    @staticmethod
+    def _stat(path):
+        try:
+            result = os.stat(path)
+        except OSError:
+            return None
+        return result.st_mtime_ns, result.st_size, result.st_ino
+
+    def track(self, files, directories):
+        self._files = {path: self._files.get(path) or self._stat(path) for path in files}
+        self._directories = {path: self._directories.get(path) or self._stat(path) for path in directories}
+
+    def changes(self, timeout):
+        """Espera al próximo sondeo si cae dentro de `timeout`; retorna (rutas cambiadas, directorios cambiados)"""
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(0.0, timeout))
+            return set(), set()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_poll = time.monotonic() + self.interval
+
+        paths = set()
+        for group in (self._files, self._directories):
+            for path, previous in group.items():
+                current = self._stat(path)
+                if current != previous:
+                    group[path] = current
+                    paths.add(path)
+        # Un directorio cambia de mtime cuando se crea, borra o renombra algo dentro
+        return paths, {path for path in paths if path in self._directories}
+
+    def close(self):
+        pass
+
+
+class WatchCleaner:
+    """Mantiene limpios los archivos de un árbol mientras se reescriben.
+
+    Usa inotify cuando el sistema lo ofrece, así que en reposo no gasta CPU;
+    si no, compara el stat de cada archivo y directorio cada `interval`
+    segundos. Los cambios se juntan hasta que pasan `debounce` segundos sin
+    cambios nuevos (o `MAX_DELAY` desde el primero) y un archivo solo se
+    vuelve a limpiar si su contenido cambió: un stat distinto se confirma con
+    el hash del archivo. Cada resultado se escribe en un archivo temporal y se
+    renombra sobre el anterior, así que nunca se lee una salida a medias.
+    """
+
+    DEBOUNCE = 0.05
+    POLL_INTERVAL = 0.04
+    MAX_DELAY = 1.0
+
+    def __init__(self, cleaner, paths, debounce=DEBOUNCE, interval=POLL_INTERVAL, use_inotify=True):
+        self.cleaner = cleaner
+        self.paths = list(paths)
+        self.debounce = debounce
+        self._files = {}
+        self._index = {}
+        self._watched = set()
+        self._states = {}
+        self._executor = None
+        self.latency = 0.0
+        self._output_dir = os.path.realpath(cleaner.output_dir)
+        self._explicit = {os.path.normpath(path) for path in self.paths if not glob.has_magic(path)}
+        self._patterns = [path for path in self.paths if glob.has_magic(path)]
+        self._source = (_Inotify.create() if use_inotify else None) or _StatPoller(interval)
+
+    @property
+    def uses_inotify(self):
+        return isinstance(self._source, _Inotify)
+
+    def _may_track(self, path):
+        """Indica si un archivo nuevo podría entrar en las rutas vigiladas"""
+        path = os.path.normpath(path)
+        return (path.endswith(self.cleaner.extensions) or path in self._explicit
+                or any(fnmatch.fnmatch(path, os.path.normpath(pattern)) for pattern in self._patterns))
+
+    def _needs_scan(self, structure):
+        """Indica si las rutas creadas, borradas o movidas cambian el conjunto de archivos.
+
+        Reemplazar un archivo conocido (escribir un temporal y renombrarlo
+        encima) no lo cambia y solo hace falta volver a limpiarlo.
+        """
+        for path in structure:
+            path = os.path.normpath(path)
+            if path in self._index:
+                if not os.path.lexists(path):
+                    return True
+            elif path in self._watched or os.path.isdir(path) or self._may_track(path):
+                return True
+        return False
+
+    def _directories(self):
+        """Retorna los directorios a vigilar: los árboles indicados, sin el de salida"""
+        roots = set()
+        for path in self.paths:
+            if glob.has_magic(path):
+                roots.add(BatchCleaner._glob_root(path))
+            elif os.path.isdir(path):
+                roots.add(path)
+            else:
+                roots.add(os.path.dirname(path) or ".")
+        directories = []
+        for root in roots:
+            for current, dirs, _ in os.walk(root):
+                dirs[:] = [d for d in dirs if os.path.realpath(os.path.join(current, d)) != self._output_dir]
+                directories.append(current)
+        return directories
+
+    def scan(self):
+        """Vuelve a expandir las rutas vigiladas; retorna los archivos nuevos"""
+        files = dict(self.cleaner.collect_files(self.paths))
+        for source in set(self._states) - set(files):
+            del self._states[source]
+        added = [source for source in files if source not in self._files]
+        self._files = files
+        self._index = {os.path.normpath(source): source for source in files}
+        directories = self._directories()
+        self._watched = set(map(os.path.normpath, directories))
+        self._source.track(files, directories)
+        return added
+
+    # Limpieza
+
+    @staticmethod
+    def _stat(path):
+        result = os.stat(path)
+        return result.st_mtime_ns, result.st_size, result.st_ino
+
+    @staticmethod
+    def _digest(path):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.digest()
+
+    def _changed(self, sources):
+        """Retorna los archivos cuyo contenido cambió desde su última limpieza"""
+        changed = []
+        for source in sources:
+            try:
+                stat = self._stat(source)
+                state = self._states.get(source)
+                if state and state[0] == stat:
+                    continue
+                digest = self._digest(source)
+            except OSError:
+                # Borrado o reemplazado a medias: lo resuelve la próxima expansión
+                self._states.pop(source, None)
+                continue
+            if state and state[1] == digest:
+                self._states[source] = (stat, digest)
+            else:
+                changed.append((source, stat, digest))
+        return changed
+
+    def _job(self, source):
+        """Retorna el trabajo de limpieza hacia un temporal junto al destino final"""
+        target = os.path.join(self.cleaner.output_dir, self._files[source])
+        directory = os.path.dirname(target) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        os.close(fd)
+        os.chmod(tmp_path, NEW_FILE_MODE)
+        return (source, tmp_path, self.cleaner.write_maps, self.cleaner.encoding, self.cleaner.language), target
+
+    def _replace(self, job, target):
+        _, tmp_path, write_map, _, _ = job
+        if write_map:
+            os.replace(tmp_path + BatchCleaner.MAP_SUFFIX, target + BatchCleaner.MAP_SUFFIX)
+        os.replace(tmp_path, target)
+
+    @staticmethod
+    def _discard(job):
+        for path in (job[1], job[1] + BatchCleaner.MAP_SUFFIX):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clean(self, changed):
+        """Limpia los (archivo, stat, hash) indicados; retorna (limpiados, errores por archivo)"""
+        jobs = [self._job(source) for source, _, _ in changed]
+        if len(jobs) > 1 and self.cleaner.workers > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.cleaner.workers)
+            futures = [self._executor.submit(BatchCleaner.clean_file, job) for job, _ in jobs]
+            outcomes = [future.exception() for future in futures]
+        else:
+            outcomes = []
+            for job, _ in jobs:
+                try:
+                    BatchCleaner.clean_file(job)
+                    outcomes.append(None)
+                except Exception as error:
+                    outcomes.append(error)
+
+        cleaned = []
+        errors = {}
+        for (source, stat, digest), (job, target), error in zip(changed, jobs, outcomes):
+            try:
+                if error is None:
+                    self._replace(job, target)
+            except OSError as replace_error:
+                error = replace_error
+            if error is not None:
+                self._discard(job)
+                errors[source] = error
+                continue
+            # Si se reescribió mientras se limpiaba, el stat ya no coincide y vuelve a revisarse
+            self._states[source] = (stat, digest)
+            cleaned.append(source)
+        return cleaned, errors
+
+    def start(self):
+        """Expande las rutas y limpia todos los archivos; retorna (limpiados, errores)"""
+        self.scan()
+        return self.clean(self._changed(list(self._files)))
+
+    def step(self, timeout=None):
+        """Espera cambios, los junta y limpia los archivos que cambiaron.
+
+        Retorna (limpiados, errores), vacíos si no hubo cambios en `timeout`
+        segundos (None espera sin límite).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = 3600.0 if deadline is None else deadline - time.monotonic()
+            if wait < 0:
+                return [], {}
+            paths, structure = self._source.changes(wait)
+            if paths or paths is None:
+                break
+
+        first = time.monotonic()
+        while paths is not None:
+            more, more_structure = self._source.changes(min(self.debounce, first + self.MAX_DELAY - time.monotonic()))
+            if more is None:
+                paths = structure = None
+                break
+            paths |= more
+            structure |= more_structure
+            if not more or time.monotonic() - first >= self.MAX_DELAY:
+                break
+
+        if paths is None:
+            self.scan()
+            candidates = list(self._files)
+        else:
+            added = self.scan() if self._needs_scan(structure) else []
+            candidates = [self._index[path] for path in map(os.path.normpath, paths) if path in self._index] + added
+        cleaned, errors = self.clean(self._changed(dict.fromkeys(candidates)))
+        self.latency = time.monotonic() - first
+        return cleaned, errors
+
+    def run(self, report=None):
+        """Vigila hasta que se interrumpa, llamando `report(limpiados, errores, segundos)` tras cada limpieza.
+
+        Los segundos van desde el primer cambio detectado hasta que las salidas quedan escritas.
+        """
+        while True:
+            cleaned, errors = self.step()
+            if report and (cleaned or errors):
+                report(cleaned, errors, self.latency)
+
+    def close(self):
+        self._source.close()
+        if self._executor is not None:
+            self._executor.shutdown()
@@ -31,17 +31,7 @@ class InstructionsDialog(QDialog):
         """Crea el título principal"""
         title = QLabel("🧹 <b>Code Cleaner V1</b> - <i>Quick Start Guide</i>")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-            font-size: 20px; 
-            color: #1e3a8a; 
-            margin-bottom: 6px;
-            font-weight: bold;
-            padding: 6px 12px;
-            background-color: #f8fafc;
-            border: 1px solid #000000;
-            border-radius: 0px;
-            font-family: 'Segoe UI', 'Calibri', Arial, sans-serif;
-        """)
+        title.setObjectName("dialogTitle")
         layout.addWidget(title)
 
     def _create_instructions_content(self):
@@ -80,46 +70,19 @@ class InstructionsDialog(QDialog):
         # Agregar instrucciones
         for title_text, desc_text in self._create_instructions_content():
             section_title = QLabel(title_text)
-            section_title.setStyleSheet("""
-                font-size: 15px; 
-                font-weight: bold; 
-                color: #1e40af; 
-                margin-top: 3px;
-                padding: 4px 8px;
-                background-color: #dbeafe;
-                border: 1px solid #000000;
-                border-radius: 0px;
-            """)
+            section_title.setObjectName("sectionTitle")
             content_layout.addWidget(section_title)
             
             if desc_text:
                 section_desc = QLabel(desc_text)
                 section_desc.setWordWrap(True)
-                section_desc.setStyleSheet("""
-                    font-size: 13px; 
-                    color: #374151; 
-                    margin-left: 8px; 
-                    margin-bottom: 6px;
-                    padding: 6px;
-                    background-color: #f8fafc;
-                    border: 1px solid #e5e7eb;
-                    border-radius: 0px;
-                """)
+                section_desc.setObjectName("sectionDesc")
                 content_layout.addWidget(section_desc)
         
         # Nota final
         note = QLabel("🚀 <b>Ready to start?</b> Close this dialog and begin cleaning your code!")
         note.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        note.setStyleSheet("""
-            font-size: 15px; 
-            color: #16a34a; 
-            font-weight: bold;
-            margin-top: 10px; 
-            padding: 8px; 
-            background-color: #dcfce7; 
-            border-radius: 0px; 
-            border: 1px solid #000000;
-        """)
+        note.setObjectName("dialogNote")
         content_layout.addWidget(note)
         
         content_layout.addStretch()
@@ -131,37 +94,11 @@ class InstructionsDialog(QDialog):
         button_layout = QHBoxLayout()
         
         self.dont_show_again = QPushButton("✅ Don't show again")
-        self.dont_show_again.setStyleSheet("""
-            QPushButton {
-                background-color: #fee2e2;
-                color: #991b1b;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 8px 16px;
-                border: 1px solid #000000;
-                border-radius: 0px;
-            }
-            QPushButton:hover {
-                background-color: #fca5a5;
-            }
-        """)
+        self.dont_show_again.setObjectName("dontShowButton")
         self.dont_show_again.clicked.connect(self.dont_show_clicked)
         
         close_btn = QPushButton("🚀 Start Using Code Cleaner")
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #dcfce7;
-                color: #166534;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 8px 16px;
-                border: 1px solid #000000;
-                border-radius: 0px;
-            }
-            QPushButton:hover {
-                background-color: #bbf7d0;
-            }
-        """)
+        close_btn.setObjectName("startButton")
         close_btn.clicked.connect(self.accept)
         
         button_layout.addWidget(self.dont_show_again)
@@ -1,66 +1,91 @@
+import os
 import sys
+import time
+
+# Se toma antes de importar Qt para que el perfil de arranque incluya los imports
+IMPORT_START = time.perf_counter()
+
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QHBoxLayout, QVBoxLayout, QPlainTextEdit, 
-    QPushButton, QLabel, QSizePolicy, QTextEdit, QLineEdit, QGroupBox
+    QPushButton, QLabel, QSizePolicy, QLineEdit, QGroupBox, QProgressBar,
+    QFileDialog, QMessageBox, QComboBox
 )
-from PyQt6.QtGui import QFont, QTextCursor, QTextCharFormat, QColor
-from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QFont, QTextCursor, QShortcut, QKeySequence
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
 
 # Imports locales
 from components.line_number_area import LineNumberArea
+from components.line_highlighter import LineHighlighter
+from components.line_view import LineView
+from components.stats_model import StatsModel
+from components.document_index import DocumentIndex
+from components.clean_worker import CleanWorker
 from styles.style_manager import StyleManager
-from dialogs.instructions_dialog import InstructionsDialog
-from core.code_processor import CodeProcessor
+from core.incremental import IncrementalCleaner
+from core.source_file import SourceFile
+from core.line_set import LineSet
+from core.languages import LanguageRegistry
+from core.startup_profile import StartupProfile
+from core.instrumentation import Instrumentation
 
 class CodeCleaner(QWidget):
-    def __init__(self):
+    # Tamaño aproximado de cada inserción al pegar, cortado en saltos de línea
+    PASTE_CHUNK_CHARS = 1 << 20
+
+    def __init__(self, profile=None):
         super().__init__()
+        self._profile = profile or StartupProfile(enabled=False)
         self._initialize_data()
         self._setup_window()
+        self._profile.mark("window setup")
         self._setup_ui()
+        self._profile.mark("widgets")
         self._connect_signals()
         self._update_all_counters()
-        self.show_instructions_dialog()
+        self._profile.mark("signals and counters")
 
     def _setup_window(self):
         """Configura las propiedades básicas de la ventana"""
         self.setWindowTitle("Code Cleaner V1 (PyQt6)")
         self.resize(1200, 700)
-        self.setStyleSheet(StyleManager.get_main_style())
+        # Una sola hoja de estilos para toda la aplicación, antes de crear los widgets
+        app = QApplication.instance()
+        if app.styleSheet() != StyleManager.get_app_style():
+            app.setStyleSheet(StyleManager.get_app_style())
 
     def _initialize_data(self):
         """Inicializa las estructuras de datos"""
-        self.highlighted_lines = set()
-        self.highlighted_output_lines = set()
+        self.highlighted_lines = LineSet()
+        self.highlighted_output_lines = LineSet()
+        self._clean_worker = None
+        self._output_key = None
+        self.incremental = None
+        self._source_path = None
+        self._result_cache = None
+        self.perf_overlay = None
+        self._first_frame_shown = False
+        self._line_count = 1
+        self._bulk_edit = False
+
+    @property
+    def result_cache(self):
+        """Caché de resultados; se importa y crea con la primera limpieza"""
+        if self._result_cache is None:
+            from core.cache import ResultCache
+            self._result_cache = ResultCache(directory=os.environ.get("CODE_CLEANER_CACHE_DIR"))
+        return self._result_cache
 
     def _create_title(self):
         """Crea el título principal"""
         title = QLabel("🧹 <b>Code Cleaner V1</b>")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title.setStyleSheet("""
-            font-size: 28px; 
-            margin-bottom: 15px; 
-            color: #1e3a8a;
-            font-weight: bold;
-            padding: 12px 20px;
-            background-color: #f8fafc;
-            border: 1px solid #000000;
-            border-radius: 0px;
-            font-family: 'Segoe UI', 'Calibri', Arial, sans-serif;
-        """)
+        title.setObjectName("titleLabel")
         return title
 
     def _create_range_inputs(self):
         """Crea los inputs para selección de rango"""
         inputs_group = QGroupBox()
-        inputs_group.setStyleSheet("""
-            QGroupBox { 
-                border: 1px solid #000000; 
-                border-radius: 0px; 
-                background: transparent; 
-                margin: 2px;
-            }
-        """)
+        inputs_group.setObjectName("toolbarGroup")
         inputs_group.setFixedHeight(90)  # Aumenté de 80 a 90 para más espacio
         inputs_layout = QHBoxLayout(inputs_group)
         inputs_layout.setContentsMargins(8, 8, 8, 8)  # Márgenes ajustados
@@ -79,36 +104,12 @@ class CodeCleaner(QWidget):
         self.select_btn = QPushButton("Select")
         self.select_btn.setFixedWidth(100)
         self.select_btn.setFixedHeight(35)  # Aumenté de 30 a 35 para mejor visualización
-        self.select_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #dbeafe;
-                color: #1e40af;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 5px;
-                border: 1px solid #93c5fd;
-            }
-            QPushButton:hover {
-                background-color: #93c5fd;
-            }
-        """)
+        self.select_btn.setObjectName("selectButton")
         
         self.unselect_btn = QPushButton("Unselect")
         self.unselect_btn.setFixedWidth(110)
         self.unselect_btn.setFixedHeight(35)  # Aumenté de 30 a 35 para mejor visualización
-        self.unselect_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f3f4f6;
-                color: #374151;
-                font-weight: bold;
-                font-size: 12px;
-                padding: 5px;
-                border: 1px solid #d1d5db;
-            }
-            QPushButton:hover {
-                background-color: #d1d5db;
-            }
-        """)
+        self.unselect_btn.setObjectName("unselectButton")
         
         inputs_layout.addStretch()
         inputs_layout.addWidget(self.from_box)
@@ -122,15 +123,7 @@ class CodeCleaner(QWidget):
     def _create_editor_with_line_numbers(self, is_readonly=False):
         """Crea un editor con números de línea"""
         editor_group = QGroupBox()
-        editor_group.setStyleSheet("""
-            QGroupBox { 
-                border: 1px solid #000000; 
-                border-radius: 0px; 
-                margin-top: 0px; 
-                background: #f8fafc; 
-                padding: 8px;
-            }
-        """)
+        editor_group.setObjectName("editorGroup")
         editor_group_layout = QVBoxLayout(editor_group)
         editor_group_layout.setContentsMargins(2, 2, 2, 2)
         editor_group_layout.setSpacing(0)
@@ -139,17 +132,17 @@ class CodeCleaner(QWidget):
         editor_layout.setContentsMargins(0, 0, 0, 0)
         editor_layout.setSpacing(0)
         
-        editor = QPlainTextEdit()
-        editor.setFont(QFont("Consolas", 12))
-        editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
-        editor.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        editor.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        editor.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        
         if is_readonly:
-            editor.setReadOnly(True)
+            # La salida solo se muestra: un visor virtual no construye un QTextDocument
+            editor = LineView()
         else:
+            editor = QPlainTextEdit()
+            editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+            editor.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+            editor.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
             editor.installEventFilter(self)
+        editor.setFont(QFont("Consolas", 12))
+        editor.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         
         line_numbers = LineNumberArea(editor, self)
         line_numbers.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Expanding)
@@ -167,9 +160,9 @@ class CodeCleaner(QWidget):
         stats_layout.setSpacing(15)  # Aumenté el espaciado entre elementos
         
         labels = []
-        for i, (text, style, alignment) in enumerate(labels_data):
+        for i, (text, name, alignment) in enumerate(labels_data):
             label = QLabel(text)
-            label.setStyleSheet(style)
+            label.setObjectName(name)
             labels.append(label)
             
             if alignment == "left":
@@ -187,28 +180,7 @@ class CodeCleaner(QWidget):
         """Crea la tarjeta izquierda (Original Code)"""
         left_card = QGroupBox("📝 Original Code")
         left_card.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        left_card.setStyleSheet("""
-            QGroupBox {
-                font-size: 16px;
-                font-weight: bold;
-                color: #1e40af;
-                border: 1px solid #000000;
-                border-radius: 0px;
-                margin-top: 15px;
-                padding-top: 10px;
-                background-color: #fefefe;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 8px 0 8px;
-                background-color: #dbeafe;
-                border: 1px solid #000000;
-                border-radius: 0px;
-                color: #1e40af;
-                font-weight: bold;
-            }
-        """)
+        left_card.setObjectName("originalCard")
         left_card_layout = QVBoxLayout(left_card)
         left_card_layout.setSpacing(8)  # Aumenté el espaciado de 6 a 8
         left_card_layout.setContentsMargins(8, 8, 8, 8)  # Márgenes más generosos
@@ -218,12 +190,13 @@ class CodeCleaner(QWidget):
 
         # Editor con números de línea
         editor_group, self.editor, self.line_numbers = self._create_editor_with_line_numbers()
+        self.editor_highlighter = LineHighlighter(self.editor)
         
         # Estadísticas
         stats_data = [
-            ("Total Lines: 0", "color: #2563eb; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #eff6ff; border: 1px solid #bfdbfe;", "left"),
+            ("Total Lines: 0", "totalLinesLabel", "left"),
             ("", "", "center"),
-            ("Selected Lines: 0", "color: #dc2626; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #fef2f2; border: 1px solid #fecaca;", "right")
+            ("Selected Lines: 0", "selectedLinesLabel", "right")
         ]
         stats_layout, stats_labels = self._create_stats_layout(stats_data)
         self.line_count_label = stats_labels[0]
@@ -236,51 +209,48 @@ class CodeCleaner(QWidget):
 
         # Botones
         buttons_group = QGroupBox()
-        buttons_group.setStyleSheet("""
-            QGroupBox { 
-                border: 1px solid #000000; 
-                border-radius: 0px; 
-                background: transparent; 
-                margin: 2px;
-            }
-        """)
+        buttons_group.setObjectName("toolbarGroup")
         buttons_group.setFixedHeight(80)  # Aumenté de 70 a 80 para más espacio
         buttons_layout = QHBoxLayout(buttons_group)
         buttons_layout.setContentsMargins(5, 5, 5, 5)  # Márgenes más pequeños para más espacio
         buttons_layout.setSpacing(5)  # Espaciado reducido entre botones
         
+        self.open_btn = QPushButton("📂 Open File")
+        self.language_combo = QComboBox()
+        self.language_combo.addItem("Auto", None)
+        for name in LanguageRegistry.names():
+            self.language_combo.addItem(name.capitalize(), name)
+        self.language_combo.setToolTip("Comment syntax (Auto: by file extension or content)")
         self.clear_btn = QPushButton("🗑️ Clear Code")
         self.clean_btn = QPushButton("🧼 Clean Code")
         
         # Los botones ocuparán todo el espacio disponible verticalmente
+        self.open_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.language_combo.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Expanding)
         self.clear_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.clean_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         
-        # Estilos específicos para los botones
-        self.clear_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #fee2e2;
-                color: #991b1b;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #fca5a5;
-            }
-        """)
+        # Los estilos de cada botón están en StyleManager, por nombre de objeto
+        self.open_btn.setObjectName("openButton")
+        self.clear_btn.setObjectName("clearButton")
+        self.clean_btn.setObjectName("cleanButton")
         
-        self.clean_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #dbeafe;
-                color: #1e40af;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #93c5fd;
-            }
-        """)
+        # Progreso y cancelación de la limpieza en segundo plano
+        self.clean_progress = QProgressBar()
+        self.clean_progress.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.clean_progress.setVisible(False)
+
+        self.cancel_btn = QPushButton("⏹ Cancel")
+        self.cancel_btn.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Expanding)
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.setObjectName("cancelButton")
         
+        buttons_layout.addWidget(self.open_btn)
+        buttons_layout.addWidget(self.language_combo)
         buttons_layout.addWidget(self.clear_btn)
         buttons_layout.addWidget(self.clean_btn)
+        buttons_layout.addWidget(self.clean_progress)
+        buttons_layout.addWidget(self.cancel_btn)
         left_card_layout.addWidget(buttons_group)
 
         return left_card
@@ -289,40 +259,20 @@ class CodeCleaner(QWidget):
         """Crea la tarjeta derecha (Clean Code)"""
         right_card = QGroupBox("✨ Clean Code")
         right_card.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        right_card.setStyleSheet("""
-            QGroupBox {
-                font-size: 16px;
-                font-weight: bold;
-                color: #16a34a;
-                border: 1px solid #000000;
-                border-radius: 0px;
-                margin-top: 15px;
-                padding-top: 10px;
-                background-color: #fefefe;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 8px 0 8px;
-                background-color: #dcfce7;
-                border: 1px solid #000000;
-                border-radius: 0px;
-                color: #16a34a;
-                font-weight: bold;
-            }
-        """)
+        right_card.setObjectName("cleanCard")
         right_card_layout = QVBoxLayout(right_card)
         right_card_layout.setSpacing(8)  # Aumenté el espaciado de 6 a 8
         right_card_layout.setContentsMargins(8, 8, 8, 8)  # Márgenes más generosos
 
         # Editor con números de línea (readonly)
         output_group, self.output, self.output_line_numbers = self._create_editor_with_line_numbers(is_readonly=True)
+        self.output.set_highlighted_lines(self.highlighted_output_lines)
         
         # Estadísticas
         stats_data = [
-            ("Clean Lines: 0", "color: #16a34a; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #f0fdf4; border: 1px solid #bbf7d0;", "left"),
-            ("Deleted Lines: 0", "color: #dc2626; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #fef2f2; border: 1px solid #fecaca;", "center"),
-            ("Errors Found: 0", "color: #d97706; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #fffbeb; border: 1px solid #fed7aa;", "right")
+            ("Clean Lines: 0", "cleanLinesLabel", "left"),
+            ("Deleted Lines: 0", "deletedLinesLabel", "center"),
+            ("Errors Found: 0", "errorsLabel", "right")
         ]
         stats_layout, stats_labels = self._create_stats_layout(stats_data)
         self.output_line_count_label = stats_labels[0]
@@ -334,14 +284,7 @@ class CodeCleaner(QWidget):
 
         # Botón copiar
         copy_container = QGroupBox()
-        copy_container.setStyleSheet("""
-            QGroupBox { 
-                border: 1px solid #000000; 
-                border-radius: 0px; 
-                background: transparent; 
-                margin: 2px;
-            }
-        """)
+        copy_container.setObjectName("toolbarGroup")
         copy_container.setFixedHeight(80)  # Aumenté de 60 a 80 para más espacio
         copy_layout = QHBoxLayout(copy_container)
         copy_layout.setContentsMargins(5, 5, 5, 5)  # Márgenes más pequeños para más espacio
@@ -350,17 +293,12 @@ class CodeCleaner(QWidget):
         self.copy_btn = QPushButton("📋 Copy Result")
         # El botón ocupará todo el espacio disponible
         self.copy_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self.copy_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #dcfce7;
-                color: #166534;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #bbf7d0;
-            }
-        """)
+        self.copy_btn.setObjectName("copyButton")
+        self.save_btn = QPushButton("💾 Save Result")
+        self.save_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.save_btn.setObjectName("saveButton")
         copy_layout.addWidget(self.copy_btn)
+        copy_layout.addWidget(self.save_btn)
         right_card_layout.addWidget(copy_container)
 
         return right_card
@@ -386,77 +324,222 @@ class CodeCleaner(QWidget):
 
     def _connect_signals(self):
         """Conecta todas las señales"""
+        # Índice de líneas del original, antes que cualquier otro lector del documento
+        self.editor_index = DocumentIndex(self.editor.document())
+
         # Editores
         self.editor.textChanged.connect(self.update_line_numbers)
-        self.editor.textChanged.connect(self.update_line_count)
         self.output.textChanged.connect(self.update_output_line_numbers)
+        self.editor.document().contentsChange.connect(self._on_editor_contents_change)
+
+        # Estadísticas
+        self.stats = StatsModel(self.editor, self.output, self)
+        self.stats.updated.connect(self._show_stats)
 
         # Botones
         self.select_btn.clicked.connect(self.select_lines_range)
         self.unselect_btn.clicked.connect(self.unselect_lines_range)
+        self.open_btn.clicked.connect(self.open_file)
         self.clear_btn.clicked.connect(self.clear_editor)
         self.clean_btn.clicked.connect(self.clean_code)
+        self.cancel_btn.clicked.connect(self.cancel_clean)
         self.copy_btn.clicked.connect(self.copy_result)
+        self.save_btn.clicked.connect(self.save_result)
+
+        # Atajos
+        QShortcut(QKeySequence(Qt.Key.Key_F12), self, self.toggle_perf_overlay)
+        QShortcut(QKeySequence("Ctrl+Shift+S"), self, self.save_session)
+        QShortcut(QKeySequence("Ctrl+Shift+O"), self, self.load_session)
 
     def _update_all_counters(self):
         """Actualiza todos los contadores"""
         self.update_line_numbers()
-        self.update_line_count()
         self.update_output_line_numbers()
-        self.update_output_line_count()
-        self.update_deleted_lines_and_errors()
+        self.stats.refresh()
+
+    def _show_stats(self, stats):
+        """Muestra los contadores calculados por el modelo de estadísticas"""
+        self.line_count_label.setText(f"Total Lines: {stats['total_lines']}")
+        self.selected_count_label.setText(f"Selected Lines: {stats['selected_lines']}")
+        self.output_line_count_label.setText(f"Clean Lines: {stats['clean_lines']}")
+        self.deleted_lines_label.setText(f"Deleted Lines: {stats['deleted_lines']}")
+        self.errors_label.setText(f"Errors Found: {stats['errors']}")
 
     def update_line_numbers(self):
         self.line_numbers.update_numbers()
         self.line_numbers.verticalScrollBar().setValue(self.editor.verticalScrollBar().value())
 
-    def update_line_count(self):
-        text = self.editor.toPlainText()
-        lines = text.split('\n')
-        self.line_count_label.setText(f"Total Lines: {len(lines)}")
-        self.selected_count_label.setText(f"Selected Lines: {len(self.highlighted_lines)}")
-
     def update_output_line_numbers(self):
         self.output_line_numbers.update_numbers()
         self.output_line_numbers.verticalScrollBar().setValue(self.output.verticalScrollBar().value())
-        self.update_output_line_count()
-        self.update_deleted_lines_and_errors()
-
-    def update_output_line_count(self):
-        text = self.output.toPlainText()
-        lines = text.split('\n')
-        self.output_line_count_label.setText(f"Clean Lines: {len(lines)}")
 
     def update_deleted_lines_and_errors(self):
-        orig_lines = self.editor.toPlainText().split('\n')
-        clean_lines = self.output.toPlainText().split('\n')
-        eliminadas = max(0, len(orig_lines) - len(clean_lines))
-        self.deleted_lines_label.setText(f"Deleted Lines: {eliminadas}")
+        self.stats.invalidate_errors()
 
-        errores_editor = CodeProcessor.count_errors_in_cleaned_code(
-            orig_lines, clean_lines, self.highlighted_lines, self.highlighted_output_lines
-        )
-        self.errors_label.setText(f"Errors Found: {errores_editor}")
+    def _language_for(self, code):
+        """Retorna el lenguaje elegido en el combo o, en modo Auto, el detectado"""
+        language = self.language_combo.currentData()
+        if language is None:
+            language = LanguageRegistry.detect(self._source_path, code[:LanguageRegistry.SNIFF_CHARS])
+            self.language_combo.setToolTip(f"Comment syntax (Auto: detected {language})")
+        return language
 
     def clean_code(self):
-        code = self.editor.toPlainText()
+        code = self.editor_index.text()
         if not code.strip():
             return
-            
-        cleaned, self.mapa_limpio_a_original = CodeProcessor.clean_code(code)
-        
+
+        self.cancel_clean()
+        language = self._language_for(code)
+        key = self.result_cache.key(code, language)
+        cached = self.result_cache.get(code, key)
+        if cached is not None:
+            self._apply_clean_result(*cached, key, language)
+            return
+
+        worker = CleanWorker(code, language)
+        worker.signals.progress.connect(self._on_clean_progress)
+        worker.signals.finished.connect(self._on_clean_finished)
+        worker.signals.cancelled.connect(self._on_clean_cancelled)
+        self._clean_worker = worker
+        self._clean_key = key
+        self._clean_language = language
+        self._clean_version = self.editor_index.version
+        self._set_cleaning(True)
+        QThreadPool.globalInstance().start(worker)
+
+    def cancel_clean(self):
+        """Cancela la limpieza en curso, si la hay"""
+        worker = self._clean_worker
+        if worker is None:
+            return
+        worker.cancel()
+        worker.signals.progress.disconnect()
+        worker.signals.finished.disconnect()
+        worker.signals.cancelled.disconnect()
+        self._on_clean_cancelled()
+
+    def _set_cleaning(self, running):
+        """Alterna los controles entre el estado normal y el de limpieza en curso"""
+        self.clean_btn.setVisible(not running)
+        self.clean_progress.setVisible(running)
+        self.cancel_btn.setVisible(running)
+        self.clean_progress.setValue(0)
+
+    def _on_clean_progress(self, done, total):
+        self.clean_progress.setMaximum(total)
+        self.clean_progress.setValue(done)
+
+    def _on_clean_cancelled(self):
+        self._clean_worker = None
+        self._set_cleaning(False)
+
+    def _on_clean_finished(self, cleaned, line_mapping, comment_spans):
+        self._clean_worker = None
+        self._set_cleaning(False)
+        # El resultado no corresponde al texto actual si el editor cambió mientras tanto:
+        # se descarta y se vuelve a limpiar la versión actual
+        if self.editor_index.version != self._clean_version:
+            self._drop_incremental()
+            self.clean_code()
+            return
+
+        self.result_cache.put(None, cleaned, line_mapping, comment_spans, key=self._clean_key)
+        self._apply_clean_result(cleaned, line_mapping, comment_spans, self._clean_key, self._clean_language)
+
+    def _apply_clean_result(self, cleaned, line_mapping, comment_spans, key, language):
+        """Muestra el resultado de una limpieza y sincroniza los resaltados"""
+        # A partir de aquí las ediciones del original solo re-limpian la región cambiada
+        self.incremental = IncrementalCleaner(line_mapping, comment_spans,
+                                              self.editor.document().blockCount(), language)
         self.highlighted_output_lines.clear()
-        self.output.setPlainText(cleaned)
+        # La salida es de solo lectura: si ya muestra este resultado no se recarga
+        if key != self._output_key:
+            self.output.setPlainText(cleaned)
+            self._output_key = key
         self.sync_highlight_to_output()
-        self.update_output_line_numbers()
-        self.update_deleted_lines_and_errors()
+
+    def _on_editor_contents_change(self, position, removed, added):
+        """Mueve las marcas con su código y re-limpia solo las líneas afectadas por la edición"""
+        index = self.editor_index
+        first = index.line_at(position)
+        new_stop = index.line_at(position + added) + 1
+        old_stop = new_stop - (len(index) - self._line_count)
+        self._line_count = len(index)
+
+        # Las inserciones en bloque se remapean al final, con un diff de la región
+        if not self._bulk_edit and self.highlighted_lines:
+            # Si la edición empieza al inicio de una línea, el resto de la última
+            # línea vieja queda como última línea nueva; si no, la primera se queda
+            if position == index.offset(first):
+                blocks = [(old_stop - 1 - first, new_stop - 1 - first, 1)]
+            else:
+                blocks = [(0, 0, 1)]
+            self._remap_highlights(first, old_stop, new_stop, blocks)
+            self.highlight_line()
+
+        if self.incremental is None:
+            return
+        if self._clean_worker is not None:
+            # El mapeo vigente se quedaría una edición atrás: hasta la próxima limpieza no hay mapeo
+            self._drop_incremental()
+            return
+
+        start, stop, new_lines = self.incremental.apply_edit(index.reader(new_stop - first), first, old_stop, new_stop)
+        self._patch_output(start, stop, new_lines)
+        self._output_key = None
+        self._patch_output_highlights(start, stop, len(new_lines))
+
+    def _drop_incremental(self):
+        """Descarta el mapeo de la última limpieza y las marcas de salida que dependían de él"""
+        self.incremental = None
+        self.highlighted_output_lines.clear()
+        self.highlight_output_line()
+
+    def _remap_highlights(self, first, old_stop, new_stop, blocks):
+        """Actualiza las marcas tras reemplazar las líneas [first, old_stop) por [first, new_stop).
+
+        `blocks` son los tramos (inicio viejo, inicio nuevo, largo), relativos a
+        `first`, que se conservaron: sus marcas se mueven a la nueva posición, las
+        del resto de la región se quitan y las posteriores se desplazan.
+        """
+        lines = self.highlighted_lines
+        moved = [first + new + offset
+                 for old, new, size in blocks
+                 for offset in range(size)
+                 if first + old + offset in lines]
+        lines.discard_range(first, old_stop)
+        lines.shift(old_stop, new_stop - old_stop)
+        for line in moved:
+            lines.add(line)
+
+    def _patch_output(self, start, stop, new_lines):
+        """Reemplaza las líneas [start, stop) de la salida por new_lines"""
+        if start == stop and not new_lines:
+            return
+        self.output.replace_lines(start, stop, new_lines)
+
+    def _patch_output_highlights(self, start, stop, count):
+        """Actualiza las marcas de la salida tras reemplazar sus líneas [start, stop) por `count` líneas"""
+        output_lines = self.highlighted_output_lines
+        if not output_lines and not self.highlighted_lines:
+            return
+        output_lines.discard_range(start, stop)
+        output_lines.shift(stop, count - (stop - start))
+        line_map = self.incremental.line_map
+        for clean in range(start, start + count):
+            if line_map.to_original(clean) in self.highlighted_lines:
+                output_lines.add(clean)
+        self.highlight_output_line()
 
     def sync_highlight_to_output(self):
-        if not hasattr(self, 'mapa_limpio_a_original'):
+        line_map = self._line_map()
+        if line_map is None:
             return
-        for idx_limpio, idx_original in enumerate(self.mapa_limpio_a_original):
-            if idx_original in self.highlighted_lines:
-                self.highlighted_output_lines.add(idx_limpio)
+        # El mapeo es creciente: cada rango de líneas originales resaltadas
+        # corresponde a un rango contiguo de líneas limpias
+        for start, end in self.highlighted_lines.runs():
+            self.highlighted_output_lines.add_range(*line_map.clean_range(start, end))
         self.highlight_output_line()
 
     def copy_result(self):
@@ -465,47 +548,71 @@ class CodeCleaner(QWidget):
             clipboard = QApplication.clipboard()
             clipboard.setText(result)
 
-    def toggle_highlight_line(self, line_number):
-        if line_number in self.highlighted_lines:
-            self.highlighted_lines.remove(line_number)
+    def save_result(self):
+        """Guarda el resultado escribiendo las líneas de la salida por bloques"""
+        if not self.output.lines():
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Clean Code")
+        if not path:
+            return
+        try:
+            SourceFile.write_lines(path, self.output.lines())
+        except (OSError, UnicodeError) as error:
+            QMessageBox.warning(self, "Save Result", f"Could not save {path}:\n{error}")
+
+    def _line_map(self):
+        """Retorna el mapeo de la limpieza vigente, o None si el original ya no le corresponde"""
+        return self.incremental.line_map if self.incremental is not None else None
+
+    def _set_output_highlight(self, line_number, highlighted):
+        if highlighted:
+            self.highlighted_output_lines.add(line_number)
         else:
+            self.highlighted_output_lines.discard(line_number)
+        self.highlight_output_line()
+        self.output_line_numbers.update()
+
+    def toggle_highlight_line(self, line_number):
+        highlighted = line_number not in self.highlighted_lines
+        if highlighted:
             self.highlighted_lines.add(line_number)
+        else:
+            self.highlighted_lines.remove(line_number)
         self.highlight_line()
         self.line_numbers.update()
 
+        # La línea limpia correspondiente se encuentra en O(1)
+        line_map = self._line_map()
+        if line_map is not None:
+            clean_line = line_map.to_clean(line_number)
+            if clean_line >= 0:
+                self._set_output_highlight(clean_line, highlighted)
+
     def toggle_highlight_output_line(self, line_number):
-        pass
+        line_map = self._line_map()
+        if line_map is None:
+            return
+        original_line = line_map.to_original(line_number)
+        if original_line < 0:
+            return
+
+        highlighted = line_number not in self.highlighted_output_lines
+        if highlighted:
+            self.highlighted_lines.add(original_line)
+        else:
+            self.highlighted_lines.discard(original_line)
+        self.highlight_line()
+        self.line_numbers.update()
+        self._set_output_highlight(line_number, highlighted)
 
+    @Instrumentation.timed("CodeCleaner.highlight_line")
     def highlight_line(self):
-        extraSelections = []
-        for line_number in self.highlighted_lines:
-            selection = QTextEdit.ExtraSelection()
-            line_color = QColor(255, 102, 102, 100)
-            selection.format.setBackground(line_color)
-            selection.format.setProperty(QTextCharFormat.Property.FullWidthSelection, True)
-            cursor = self.editor.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.Start)
-            cursor.movePosition(QTextCursor.MoveOperation.Down, QTextCursor.MoveMode.MoveAnchor, line_number)
-            cursor.select(QTextCursor.SelectionType.LineUnderCursor)
-            selection.cursor = cursor
-            extraSelections.append(selection)
-        self.editor.setExtraSelections(extraSelections)
+        self.editor_highlighter.apply(self.highlighted_lines)
         self.selected_count_label.setText(f"Selected Lines: {len(self.highlighted_lines)}")
+        self.update_deleted_lines_and_errors()
 
     def highlight_output_line(self):
-        extraSelections = []
-        for line_number in self.highlighted_output_lines:
-            selection = QTextEdit.ExtraSelection()
-            line_color = QColor(255, 102, 102, 100)
-            selection.format.setBackground(line_color)
-            selection.format.setProperty(QTextCharFormat.Property.FullWidthSelection, True)
-            cursor = self.output.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.Start)
-            cursor.movePosition(QTextCursor.MoveOperation.Down, QTextCursor.MoveMode.MoveAnchor, line_number)
-            cursor.select(QTextCursor.SelectionType.LineUnderCursor)
-            selection.cursor = cursor
-            extraSelections.append(selection)
-        self.output.setExtraSelections(extraSelections)
+        self.output.set_highlighted_lines(self.highlighted_output_lines)
         self.update_deleted_lines_and_errors()
 
     def select_lines_range(self):
@@ -525,10 +632,16 @@ class CodeCleaner(QWidget):
         self.highlight_line()
         self.line_numbers.update()
 
-        cursor = self.editor.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.Start)
-        cursor.movePosition(QTextCursor.MoveOperation.Down, QTextCursor.MoveMode.MoveAnchor, from_line)
-        self.editor.setTextCursor(cursor)
+        line_map = self._line_map()
+        if line_map is not None:
+            self.highlighted_output_lines.add_range(*line_map.clean_range(from_line, to_line))
+            self.highlight_output_line()
+            self.output_line_numbers.update()
+
+        block = self.editor.document().findBlockByNumber(from_line)
+        if not block.isValid():
+            block = self.editor.document().lastBlock()
+        self.editor.setTextCursor(QTextCursor(block))
         self.editor.ensureCursorVisible()
 
     def unselect_lines_range(self):
@@ -536,9 +649,165 @@ class CodeCleaner(QWidget):
         self.highlight_line()
         self.line_numbers.update()
 
+        if self._line_map() is not None:
+            self.highlighted_output_lines.clear()
+            self.highlight_output_line()
+            self.output_line_numbers.update()
+
+    def _split_paste(self, text):
+        """Corta un texto en bloques de PASTE_CHUNK_CHARS terminados en salto de línea"""
+        start = 0
+        while start < len(text):
+            end = text.find("\n", start + self.PASTE_CHUNK_CHARS)
+            end = len(text) if end < 0 else end + 1
+            yield text[start:end]
+            start = end
+
+    def paste_from_clipboard(self):
+        """Pega el portapapeles en una sola edición, sin historial ni señales por bloque"""
+        mime = QApplication.clipboard().mimeData()
+        if mime is None or not mime.hasText():
+            return
+        self._insert_bulk(self.editor.textCursor(), self._split_paste(mime.text()))
+
+    def open_file(self):
+        """Carga un archivo en el editor leyéndolo por bloques con mmap"""
+        path, _ = QFileDialog.getOpenFileName(self, "Open Source File")
+        if not path:
+            return
+        cursor = self.editor.textCursor()
+        cursor.select(QTextCursor.SelectionType.Document)
+        # Un archivo nuevo empieza su propia sesión: hay que volver a limpiar
+        self.incremental = None
+        self._source_path = path
+        self.highlighted_lines.clear()
+        try:
+            self._insert_bulk(cursor, SourceFile.iter_text(path))
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Open File", f"Could not open {path}:\n{error}")
+        self.highlight_line()
+        self.line_numbers.update()
+
+    def save_session(self):
+        """Guarda el original, la salida, el mapeo y los resaltados en una sesión binaria"""
+        from core.session import SessionFile
+        path, _ = QFileDialog.getSaveFileName(self, "Save Session", "", f"Sessions (*{SessionFile.SUFFIX})")
+        if not path:
+            return
+        if not path.endswith(SessionFile.SUFFIX):
+            path += SessionFile.SUFFIX
+        try:
+            self.write_session(path)
+        except (OSError, UnicodeError) as error:
+            QMessageBox.warning(self, "Save Session", f"Could not save {path}:\n{error}")
+
+    def write_session(self, path):
+        from core.session import SessionFile
+        incremental = self.incremental
+        SessionFile.write(
+            path,
+            self.editor_index.text(),
+            self.output.lines(),
+            incremental.line_mapping if incremental is not None else (),
+            incremental.comment_spans if incremental is not None else (),
+            self.highlighted_lines,
+            self.highlighted_output_lines,
+            (incremental.language or LanguageRegistry.DEFAULT) if incremental is not None else None,
+            self._source_path,
+        )
+
+    def load_session(self):
+        from core.session import SessionFile
+        path, _ = QFileDialog.getOpenFileName(self, "Load Session", "", f"Sessions (*{SessionFile.SUFFIX})")
+        if not path:
+            return
+        try:
+            self.restore_session(path)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Load Session", f"Could not load {path}:\n{error}")
+
+    def restore_session(self, path):
+        """Restaura una sesión guardada sin volver a limpiar el original"""
+        from core.session import SessionFile
+        self.cancel_clean()
+        with SessionFile(path) as session:
+            # Mientras se reemplaza el original no hay limpieza que actualizar
+            self.incremental = None
+            self.highlighted_lines.clear()
+            cursor = self.editor.textCursor()
+            cursor.select(QTextCursor.SelectionType.Document)
+            self._insert_bulk(cursor, session.iter_text("original"))
+            self.editor.moveCursor(QTextCursor.MoveOperation.Start)
+
+            self.output.set_lines(session.clean_lines())
+            self._output_key = None
+            language = session.language
+            if language is not None:
+                self.incremental = IncrementalCleaner(session.line_mapping(), session.comment_spans(),
+                                                      self.editor.document().blockCount(), language)
+            self._source_path = session.source_path
+            self.highlighted_lines = session.line_set("highlighted")
+            self.highlighted_output_lines = session.line_set("highlighted_output")
+
+        self.highlight_line()
+        self.highlight_output_line()
+        self.line_numbers.update()
+        self.output_line_numbers.update()
+
+    def _insert_bulk(self, cursor, chunks):
+        """Inserta bloques de texto en una sola edición, sin historial ni señales por bloque"""
+        editor = self.editor
+        document = editor.document()
+        index = self.editor_index
+        first = index.line_at(cursor.selectionStart())
+        old_stop = index.line_at(cursor.selectionEnd()) + 1
+        old_count = document.blockCount()
+        # Solo hace falta el texto viejo si hay marcas dentro de la región reemplazada
+        lines = self.highlighted_lines
+        old_lines = None
+        if lines and any(map(lines.__contains__, range(first, old_stop))):
+            old_lines = index.reader(old_stop - first).lines(first, old_stop)
+
+        undo_enabled = document.isUndoRedoEnabled()
+        document.setUndoRedoEnabled(False)
+        editor.blockSignals(True)
+        self._bulk_edit = True
+        cursor.beginEditBlock()
+        try:
+            for chunk in chunks:
+                cursor.insertText(chunk)
+        finally:
+            cursor.endEditBlock()
+            self._bulk_edit = False
+            editor.blockSignals(False)
+            document.setUndoRedoEnabled(undo_enabled)
+
+        if lines:
+            new_stop = old_stop + document.blockCount() - old_count
+            blocks = []
+            if old_lines is not None:
+                # El diff solo hace falta cuando se pega sobre líneas marcadas
+                from core.line_diff import LineDiff
+                blocks = LineDiff.matching_blocks(old_lines, index.reader(new_stop - first).lines(first, new_stop))
+            self._remap_highlights(first, old_stop, new_stop, blocks)
+            self.highlight_line()
+            if self.incremental is not None:
+                self.highlighted_output_lines.clear()
+                self.sync_highlight_to_output()
+
+        editor.setTextCursor(cursor)
+        editor.ensureCursorVisible()
+        # Las señales del editor estaban bloqueadas: se actualiza todo una sola vez
+        self.editor_highlighter.invalidate()
+        self._update_all_counters()
+
     def clear_editor(self):
+        # Limpiar el original no debe vaciar el resultado ya obtenido
+        self.incremental = None
+        self._source_path = None
+        self.highlighted_lines.clear()
+        self.highlight_line()
         self.editor.setPlainText("")
-        self.update_deleted_lines_and_errors()
 
     def eventFilter(self, obj, event):
         if not hasattr(self, 'editor') or obj != self.editor:
@@ -547,27 +816,76 @@ class CodeCleaner(QWidget):
         if event.type() == event.Type.KeyPress:
             if (event.modifiers() & Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_V) or \
                (event.modifiers() & Qt.KeyboardModifier.ShiftModifier and event.key() == Qt.Key.Key_Insert):
-                return False
+                self.paste_from_clipboard()
+                return True
             return True
         if event.type() == event.Type.MouseButtonDblClick or event.type() == event.Type.MouseButtonPress:
             return True
         return super().eventFilter(obj, event)
 
+    def toggle_perf_overlay(self):
+        """Muestra u oculta el panel de rendimiento; se importa y crea la primera vez que se pide con F12"""
+        if self.perf_overlay is None:
+            from components.perf_overlay import PerfOverlay
+            self.perf_overlay = PerfOverlay(self)
+        self.perf_overlay.toggle()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.perf_overlay is not None and self.perf_overlay.isVisible():
+            self.perf_overlay.reposition()
+
+    def closeEvent(self, event):
+        self.cancel_clean()
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_frame_shown:
+            self._first_frame_shown = True
+            # Lo que no hace falta para el primer cuadro se hace con la ventana ya visible
+            QTimer.singleShot(0, self._after_first_frame)
+
+    def _after_first_frame(self):
+        self._profile.mark("first frame")
+        self.show_instructions_dialog()
+
+    def _create_instructions_dialog(self):
+        """Crea el diálogo de instrucciones, importándolo recién cuando se necesita"""
+        from dialogs.instructions_dialog import InstructionsDialog
+        return InstructionsDialog(self)
+
     def show_instructions_dialog(self):
-        dialog = InstructionsDialog(self)
+        dialog = self._create_instructions_dialog()
+        self._profile.mark("instructions dialog")
+        self._profile.report()
         dialog.exec()
         
         if dialog.dont_show:
             pass
 
     def show_instructions_manually(self):
-        dialog = InstructionsDialog(self)
+        dialog = self._create_instructions_dialog()
         dialog.exec()
 
 def main():
+    profile = StartupProfile.from_environment(sys.argv, IMPORT_START)
+    profile.mark("imports")
     app = QApplication(sys.argv)
-    window = CodeCleaner()
+    profile.mark("QApplication")
+    window = CodeCleaner(profile)
+    # Una sesión pasada como argumento se restaura antes de mostrar la ventana
+    if len(sys.argv) > 1:
+        from core.session import SessionFile
+        for path in sys.argv[1:]:
+            if path.endswith(SessionFile.SUFFIX):
+                try:
+                    window.restore_session(path)
+                except (OSError, ValueError) as error:
+                    print(f"Could not load {path}: {error}", file=sys.stderr)
+                break
     window.show()
+    profile.mark("show")
     sys.exit(app.exec())
 
 if __name__ == "__main__":
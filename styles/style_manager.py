@@ -1,6 +1,8 @@
 class StyleManager:
     """Maneja todos los estilos de la aplicación"""
-    
+
+    _app_style = None
+
     @staticmethod
     def get_main_style():
         return """
@@ -25,7 +27,7 @@ class StyleManager:
             QPushButton:hover {
                 background-color: #cbd5e0;
             }
-            QPlainTextEdit {
+            QPlainTextEdit, LineView {
                 background-color: #ffffff;
                 color: #2d3748;
                 border-radius: 0px;
@@ -63,6 +65,175 @@ class StyleManager:
             }
         """
 
+    @staticmethod
+    def get_window_style():
+        """Estilos de los widgets con nombre de la ventana principal"""
+        return """
+            QLabel#titleLabel {
+                font-size: 28px;
+                margin-bottom: 15px;
+                color: #1e3a8a;
+                font-weight: bold;
+                padding: 12px 20px;
+                background-color: #f8fafc;
+                border: 1px solid #000000;
+                border-radius: 0px;
+                font-family: 'Segoe UI', 'Calibri', Arial, sans-serif;
+            }
+            QGroupBox#originalCard {
+                font-size: 16px;
+                font-weight: bold;
+                color: #1e40af;
+                border: 1px solid #000000;
+                border-radius: 0px;
+                margin-top: 15px;
+                padding-top: 10px;
+                background-color: #fefefe;
+            }
+            QGroupBox#originalCard::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 8px 0 8px;
+                background-color: #dbeafe;
+                border: 1px solid #000000;
+                border-radius: 0px;
+                color: #1e40af;
+                font-weight: bold;
+            }
+            QGroupBox#cleanCard {
+                font-size: 16px;
+                font-weight: bold;
+                color: #16a34a;
+                border: 1px solid #000000;
+                border-radius: 0px;
+                margin-top: 15px;
+                padding-top: 10px;
+                background-color: #fefefe;
+            }
+            QGroupBox#cleanCard::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 8px 0 8px;
+                background-color: #dcfce7;
+                border: 1px solid #000000;
+                border-radius: 0px;
+                color: #16a34a;
+                font-weight: bold;
+            }
+            QGroupBox#editorGroup {
+                border: 1px solid #000000;
+                border-radius: 0px;
+                margin-top: 0px;
+                background: #f8fafc;
+                padding: 8px;
+            }
+            QGroupBox#toolbarGroup {
+                border: 1px solid #000000;
+                border-radius: 0px;
+                background: transparent;
+                margin: 2px;
+                padding-top: 10px;
+            }
+            QPushButton#selectButton {
+                background-color: #dbeafe;
+                color: #1e40af;
+                font-weight: bold;
+                font-size: 12px;
+                padding: 5px;
+                border: 1px solid #93c5fd;
+            }
+            QPushButton#selectButton:hover {
+                background-color: #93c5fd;
+            }
+            QPushButton#unselectButton {
+                background-color: #f3f4f6;
+                color: #374151;
+                font-weight: bold;
+                font-size: 12px;
+                padding: 5px;
+                border: 1px solid #d1d5db;
+            }
+            QPushButton#unselectButton:hover {
+                background-color: #d1d5db;
+            }
+            QPushButton#openButton, QPushButton#cancelButton, QPushButton#saveButton {
+                background-color: #f3f4f6;
+                color: #374151;
+                font-weight: bold;
+            }
+            QPushButton#openButton:hover, QPushButton#cancelButton:hover, QPushButton#saveButton:hover {
+                background-color: #d1d5db;
+            }
+            QPushButton#clearButton {
+                background-color: #fee2e2;
+                color: #991b1b;
+                font-weight: bold;
+            }
+            QPushButton#clearButton:hover {
+                background-color: #fca5a5;
+            }
+            QPushButton#cleanButton {
+                background-color: #dbeafe;
+                color: #1e40af;
+                font-weight: bold;
+            }
+            QPushButton#cleanButton:hover {
+                background-color: #93c5fd;
+            }
+            QPushButton#copyButton {
+                background-color: #dcfce7;
+                color: #166534;
+                font-weight: bold;
+            }
+            QPushButton#copyButton:hover {
+                background-color: #bbf7d0;
+            }
+            QLabel#totalLinesLabel {
+                color: #2563eb; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #eff6ff; border: 1px solid #bfdbfe;
+            }
+            QLabel#selectedLinesLabel, QLabel#deletedLinesLabel {
+                color: #dc2626; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #fef2f2; border: 1px solid #fecaca;
+            }
+            QLabel#cleanLinesLabel {
+                color: #16a34a; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #f0fdf4; border: 1px solid #bbf7d0;
+            }
+            QLabel#errorsLabel {
+                color: #d97706; font-weight: bold; font-size: 14px; padding: 4px 8px; background-color: #fffbeb; border: 1px solid #fed7aa;
+            }
+            QPlainTextEdit#lineNumberArea {
+                background-color: #f5f5f5;
+                color: #888;
+                border: none;
+            }
+            QFrame#perfOverlay {
+                background-color: rgba(15, 23, 42, 225);
+                border: 1px solid #334155;
+                border-radius: 6px;
+            }
+            QLabel#perfTable {
+                color: #e2e8f0;
+                background: transparent;
+                font-family: Consolas, 'DejaVu Sans Mono', monospace;
+                font-size: 12px;
+            }
+            QPushButton#perfButton {
+                background-color: #334155;
+                color: #e2e8f0;
+                padding: 4px 10px;
+                font-size: 12px;
+            }
+            QPushButton#perfButton:hover {
+                background-color: #475569;
+            }
+        """
+
+    @classmethod
+    def get_app_style(cls):
+        """Hoja de estilos única de la aplicación, armada una sola vez"""
+        if cls._app_style is None:
+            cls._app_style = cls.get_main_style() + cls.get_window_style()
+        return cls._app_style
+
     @staticmethod
     def get_dialog_style():
         return """
@@ -96,4 +267,66 @@ class StyleManager:
                 border-radius: 0px;
                 border: 1px solid #000000;
             }
+            QLabel#dialogTitle {
+                font-size: 20px;
+                color: #1e3a8a;
+                margin-bottom: 6px;
+                font-weight: bold;
+                padding: 6px 12px;
+                background-color: #f8fafc;
+                border: 1px solid #000000;
+                border-radius: 0px;
+                font-family: 'Segoe UI', 'Calibri', Arial, sans-serif;
+            }
+            QLabel#sectionTitle {
+                font-size: 15px;
+                font-weight: bold;
+                color: #1e40af;
+                margin-top: 3px;
+                padding: 4px 8px;
+                background-color: #dbeafe;
+                border: 1px solid #000000;
+                border-radius: 0px;
+            }
+            QLabel#sectionDesc {
+                font-size: 13px;
+                color: #374151;
+                margin-left: 8px;
+                margin-bottom: 6px;
+                padding: 6px;
+                background-color: #f8fafc;
+                border: 1px solid #e5e7eb;
+                border-radius: 0px;
+            }
+            QLabel#dialogNote {
+                font-size: 15px;
+                color: #16a34a;
+                font-weight: bold;
+                margin-top: 10px;
+                padding: 8px;
+                background-color: #dcfce7;
+                border-radius: 0px;
+                border: 1px solid #000000;
+            }
+            QPushButton#dontShowButton, QPushButton#startButton {
+                font-weight: bold;
+                font-size: 12px;
+                padding: 8px 16px;
+                border: 1px solid #000000;
+                border-radius: 0px;
+            }
+            QPushButton#dontShowButton {
+                background-color: #fee2e2;
+                color: #991b1b;
+            }
+            QPushButton#dontShowButton:hover {
+                background-color: #fca5a5;
+            }
+            QPushButton#startButton {
+                background-color: #dcfce7;
+                color: #166534;
+            }
+            QPushButton#startButton:hover {
+                background-color: #bbf7d0;
+            }
         """
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core.batch import BatchCleaner
+from core.sharded import ShardedCleaner
+
+
+class ShardedLineCountTest(unittest.TestCase):
+    SOURCES = {
+        "trailing_newline.c": "int a; // a\n/* b\n c */\nint d;\n\n" * 40,
+        "no_trailing_newline.c": "int a; // a\n/* b\n c */\nint d;" * 40,
+        "crlf.c": "int a; // a\r\nint b;\r\n" * 40,
+        "empty.c": "",
+    }
+
+    def test_streaming_and_sharded_paths_agree(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cleaner = BatchCleaner(directory, workers=2, language="c")
+            # Fragmentos chicos para que un archivo de prueba se reparta entre varios procesos
+            with mock.patch.object(ShardedCleaner, "MIN_SHARD_BYTES", 64):
+                for name, code in self.SOURCES.items():
+                    with self.subTest(name):
+                        source = os.path.join(directory, name)
+                        with open(source, "w", encoding="utf-8", newline="") as f:
+                            f.write(code)
+
+                        streamed = source + ".streamed"
+                        sharded = source + ".sharded"
+                        expected = BatchCleaner.clean_file((source, streamed, True, "utf-8", "c"))
+                        result = cleaner.clean_file_sharded((source, sharded, True, "utf-8", "c"))
+
+                        self.assertEqual(result, expected)
+                        self.assertEqual(expected[0], len(code.splitlines()))
+                        for suffix in ("", BatchCleaner.MAP_SUFFIX):
+                            with open(streamed + suffix, "rb") as a, open(sharded + suffix, "rb") as b:
+                                self.assertEqual(b.read(), a.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
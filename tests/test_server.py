@@ -0,0 +1,76 @@
+import asyncio
+import json
+import unittest
+
+from core.server import CleanServer, HTTPError
+
+
+class CleanServerTest(unittest.TestCase):
+    def test_timeout_releases_pending_files(self):
+        async def run():
+            server = CleanServer(workers=1, max_pending=5, timeout=0.001)
+            await server.start()
+            try:
+                for _ in range(2):
+                    with self.assertRaises(HTTPError) as context:
+                        await server.clean([("x = 1  # c\n" * 20000, "python", None)] * 2)
+                    self.assertEqual(context.exception.status, 504)
+                # El bucle de lotes descarta los archivos vencidos en su próxima vuelta
+                for _ in range(100):
+                    if server._pending == 0 and server._queue.empty():
+                        break
+                    await asyncio.sleep(0.01)
+                self.assertEqual(server._pending, 0)
+
+                server.timeout = 30.0
+                results = await server.clean([("x = 1  # c", "python", None)] * 5)
+                self.assertEqual([cleaned for cleaned, _, _ in results], ["x = 1"] * 5)
+            finally:
+                await server.close()
+
+        asyncio.run(run())
+
+    def test_files_in_flight_count_towards_max_pending(self):
+        async def post(port, path, payload):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps(payload).encode("utf-8")
+            writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                         .encode("latin-1") + body)
+            response = await reader.read()
+            writer.close()
+            head, _, body = response.partition(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])}
+            return int(lines[0].split(" ")[1]), headers, json.loads(body)
+
+        async def run():
+            server = CleanServer(workers=1, max_pending=10)
+            await server.start(port=0)
+            port = server.addresses()[0][1]
+            try:
+                heavy = {"files": [{"code": "x = 1  # c\n" * 50000, "language": "python"}] * 10}
+                first = asyncio.create_task(post(port, "/clean/batch", heavy))
+                # Los diez archivos ya salieron de la cola pero siguen limpiándose
+                for _ in range(1000):
+                    if server._queue.empty() and server._counters["batches"]:
+                        break
+                    await asyncio.sleep(0.001)
+                self.assertEqual(server._pending, 10)
+
+                status, headers, payload = await post(port, "/clean", {"code": "y = 2", "language": "python"})
+                self.assertEqual(status, 503)
+                self.assertEqual(headers.get("retry-after"), "1")
+                self.assertEqual(server.stats()["rejected"], 1)
+
+                status, _, payload = await first
+                self.assertEqual(status, 200)
+                self.assertEqual(len(payload["results"]), 10)
+                self.assertEqual(server._pending, 0)
+            finally:
+                await server.close()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()